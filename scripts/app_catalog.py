@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+应用目录产物（apps_catalog.json.gz）
+与apps_list_enhanced_descriptions.csv内容相同的紧凑、带类型的目录，供前端直接载入：
+- 按列存储的JSON，gzip压缩；附带版本化的schema（字段名和类型），读取方按版本判断能否解析
+- 价格、评分已转换为数字（与前端parseFloat一致，无法解析时为0）
+- 平台已拆分为列表（"Mac, iOS" -> ["Mac", "iOS"]），官网和Setapp链接为空时为null
+CSV仍是流水线的输出和人工编辑的对象，目录由它生成，不单独维护：目录中记录生成时CSV的SHA-256，
+构建前由 scripts/check_catalog.mjs 校验，CSV改动后未重新生成目录（npm run catalog）时构建失败。
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+
+import pandas as pd
+
+CATALOG_SCHEMA_VERSION = 1
+
+DEFAULT_SOURCE = os.path.join('..', 'public', 'apps_list_enhanced_descriptions.csv')
+DEFAULT_OUTPUT = os.path.join('..', 'public', 'apps_catalog.json.gz')
+
+# (字段, 类型)，顺序即CSV的列顺序
+CATALOG_FIELDS = [
+    ('名称', 'string'),
+    ('功能描述', 'string'),
+    ('Setapp链接', 'string?'),
+    ('官方网站', 'string?'),
+    ('官方订阅价格', 'float'),
+    ('评分', 'float'),
+    ('平台', 'list<string>')
+]
+
+DEFAULT_PLATFORM = 'Mac'
+
+# 与JavaScript的parseFloat相同：取开头的数字部分
+_LEADING_NUMBER_RE = r'^\s*([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)'
+
+
+def _to_float(values):
+    numbers = pd.to_numeric(values.str.extract(_LEADING_NUMBER_RE, expand=False), errors='coerce')
+    return [float(number) for number in numbers.fillna(0.0)]
+
+
+def _split_platforms(value):
+    platforms = [platform.strip() for platform in value.split(',')]
+    return [platform for platform in platforms if platform] or [DEFAULT_PLATFORM]
+
+
+def file_digest(path):
+    """文件的SHA-256（十六进制）"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_catalog(df, source_file=None):
+    """DataFrame（CSV的列）-> 目录字典；没有名称的行被丢弃
+
+    source_file为生成df的CSV文件时，记录其文件名、大小和SHA-256，供读取方判断目录是否过期。
+    """
+    df = df.reindex(columns=[field for field, _ in CATALOG_FIELDS], fill_value='')
+    df = df.fillna('').astype(str).apply(lambda column: column.str.strip())
+    df = df[df['名称'] != '']
+
+    columns = {}
+    for field, field_type in CATALOG_FIELDS:
+        values = df[field]
+        if field_type == 'float':
+            columns[field] = _to_float(values)
+        elif field_type == 'list<string>':
+            columns[field] = [_split_platforms(value) for value in values]
+        elif field_type == 'string?':
+            columns[field] = [value or None for value in values]
+        else:
+            columns[field] = values.tolist()
+
+    catalog = {
+        'schema': {
+            'version': CATALOG_SCHEMA_VERSION,
+            'fields': [{'name': field, 'type': field_type} for field, field_type in CATALOG_FIELDS]
+        }
+    }
+    if source_file:
+        catalog['source'] = {'file': os.path.basename(source_file), 'sha256': file_digest(source_file),
+                             'size': os.path.getsize(source_file)}
+    catalog['count'] = len(df)
+    catalog['columns'] = columns
+    return catalog
+
+
+def write_catalog(df, path=DEFAULT_OUTPUT, source_file=None):
+    """生成目录并原子地写出（gzip头中不含文件名，mtime固定为0，相同内容得到相同的字节），返回应用数"""
+    catalog = build_catalog(df, source_file)
+    data = json.dumps(catalog, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as raw, gzip.GzipFile(filename='', fileobj=raw, mode='wb', compresslevel=9, mtime=0) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return catalog['count']
+
+
+def add_catalog_arguments(parser):
+    """为输出CSV的脚本添加同时写出目录的参数"""
+    parser.add_argument('--catalog', metavar='PATH', default=None,
+                        help='同时写出带类型的压缩目录（如 apps_catalog.json.gz）')
+
+
+def write_catalog_from_args(args, df, source_file=None):
+    """指定了--catalog时写出目录（source_file为刚写出的CSV）"""
+    if args.catalog:
+        count = write_catalog(df, args.catalog, source_file)
+        print(f"目录已保存到: {args.catalog}（{count} 个应用, {os.path.getsize(args.catalog)} 字节）")
+
+
+def main(source=DEFAULT_SOURCE, output_file=DEFAULT_OUTPUT):
+    """由CSV生成目录"""
+    try:
+        df = pd.read_csv(source, dtype=str, keep_default_na=False)
+        count = write_catalog(df, output_file, source)
+    except Exception as e:
+        print(f"生成目录时出现错误: {e}")
+        return False
+    print(f"读取 {source}: {len(df)} 行, {os.path.getsize(source)} 字节")
+    print(f"目录已保存到: {output_file}（{count} 个应用, {os.path.getsize(output_file)} 字节）")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="由应用CSV生成带类型的压缩目录")
+    parser.add_argument('source', nargs='?', default=DEFAULT_SOURCE,
+                        help=f'应用CSV（默认 {DEFAULT_SOURCE}）')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT,
+                        help=f'输出的目录文件（默认 {DEFAULT_OUTPUT}）')
+    args = parser.parse_args()
+
+    sys.exit(0 if main(args.source, args.output) else 1)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+保存的Setapp列表页（"Apps for your tasks | Setapp"）的流式扫描
+用mmap把文件映射到内存，直接在字节上运行正则并逐个产出<app-details>标签：
+- 不把整个文件读成Python字符串，也不先生成完整的匹配列表，
+  内存占用与文件大小无关（映射的页面由操作系统按需换入换出）
+- 生成器在找到第一个标签时就能产出结果
+标签属性由parse_tag_attributes一次扫描全部解析，与属性顺序无关。
+"""
+
+import html
+import mmap
+import os
+import re
+
+# <app-details ...>标签，捕获属性部分（引号内的">"不会提前结束标签）
+APP_DETAILS_TAG_RE = re.compile(rb'<app-details\s+([^>"\']*(?:(?:"[^"]*"|\'[^\']*\')[^>"\']*)*)>')
+
+# 单个属性：名称，可选的 = 后接双引号、单引号或不带引号的值
+ATTRIBUTE_RE = re.compile(r'''([^\s"'=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+)))?''')
+
+
+def parse_tag_attributes(attributes):
+    """一次扫描解析标签的全部属性，返回{属性名(小写): 值}
+
+    支持双引号、单引号和不带引号的值，属性顺序任意；值中的HTML实体（&amp;、&#39;等）会被解码，
+    没有值的属性记为空字符串；同名属性以第一次出现的为准（与浏览器一致）。
+    """
+    # 倒序构建字典，同名属性中靠前的覆盖靠后的
+    attrs = {name.lower(): double_quoted or single_quoted or unquoted
+             for name, double_quoted, single_quoted, unquoted in reversed(ATTRIBUTE_RE.findall(attributes))}
+    if '&' in attributes:
+        attrs = {name: html.unescape(value) if '&' in value else value for name, value in attrs.items()}
+    return attrs
+
+
+def iter_tag_groups(path, pattern=APP_DETAILS_TAG_RE, encoding='utf-8'):
+    """逐个产出pattern在文件中每次匹配的分组（已解码为字符串的元组）
+
+    pattern必须是bytes正则；无法解码的字节用替换字符代替，不会中断整个文件的解析。
+    """
+    if os.path.getsize(path) == 0:
+        # 空文件无法映射
+        return
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for match in pattern.finditer(data):
+            yield tuple(group.decode(encoding, errors='replace') if group is not None else None
+                        for group in match.groups())
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+应用发现登记表
+多个发现来源并发运行时，所有来源都把找到的应用登记到这里：
+- 按slug去重，第一次出现时通知回调（例如立即提交详情获取任务）
+- 每条记录带一个优先级（来源顺序, 来源内位置），最终按优先级排序，
+  因此无论各来源完成的先后，输出顺序都与原来串行发现时一致
+- 应用信息（链接、分类、lastmod等）同样取优先级最靠前的来源，与各来源完成的先后无关
+"""
+
+import threading
+
+
+class AppRegistry:
+    """线程安全的去重应用登记表"""
+
+    def __init__(self, on_new_app=None):
+        self.on_new_app = on_new_app
+        self._apps = {}
+        self._ranks = {}
+        self._lock = threading.Lock()
+
+    def add(self, app, rank):
+        """登记一个应用，slug首次出现时返回True
+
+        同一slug被多个来源发现时保留优先级最靠前的记录（优先级和应用信息一起替换）。
+        """
+        slug = app['slug']
+        with self._lock:
+            if slug in self._apps:
+                if rank < self._ranks[slug]:
+                    self._apps[slug] = app
+                    self._ranks[slug] = rank
+                return False
+            self._apps[slug] = app
+            self._ranks[slug] = rank
+        if self.on_new_app:
+            self.on_new_app(app)
+        return True
+
+    def ordered(self):
+        """按优先级排列的唯一应用列表"""
+        with self._lock:
+            return [self._apps[slug] for slug in sorted(self._apps, key=self._ranks.get)]
+
+    def __contains__(self, slug):
+        with self._lock:
+            return slug in self._apps
+
+    def __len__(self):
+        with self._lock:
+            return len(self._apps)
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+提取器离线基准测试
+不访问setapp.com，在页面语料上逐个测量各提取函数的吞吐量、内存分配、内存峰值和波动，
+并与保存的基准结果比较：吞吐量下降或每条的分配块数/字节增加超过容差、提取结果发生变化时以非0状态退出。
+
+覆盖的提取器：
+- SetappScraperUltimate：单次遍历字段收集、extract_platform_info、
+  extract_detailed_description、extract_official_website
+- SetappDescriptionEnhancer.extract_app_description
+- parse_html_apps.parse_html_file 和 enhanced_html_parser.parse_html_file_enhanced 的列表页解析
+- <app-details>属性解析：一次扫描的parse_tag_attributes，与原来的逐属性re.search
+  和enhanced_html_parser原来的固定顺序正则对比（后两者作为参考实现保留在本文件中）
+
+语料：
+- 默认按固定随机种子生成（详情页 + 含<app-details>标签的列表页），每次运行完全相同
+- 也可以用 --corpus 指定HTTP缓存目录或*.html目录作为详情页，--listing 指定真实的列表页
+
+用法：
+  python benchmark_extractors.py --save-baseline extractor_baseline.json
+  python benchmark_extractors.py --baseline extractor_baseline.json
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import logging
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import html_backend
+from app_details_scanner import APP_DETAILS_TAG_RE, parse_tag_attributes
+from benchmark_parsers import EDGE_CASE_PAGES, load_corpus, app_info_for
+from document_memo import DocumentMemo
+from enhanced_html_parser import parse_html_file_enhanced
+from http_cache import HttpCache
+from http_client import SetappHttpClient
+from parse_html_apps import parse_html_file
+from run_journal import RunJournal
+from scrape_state import ScrapeState
+from setapp_description_enhancer import SetappDescriptionEnhancer
+from setapp_scraper_ultimate import SetappScraperUltimate, APP_DETAIL_ENGINE
+
+BASELINE_VERSION = 1
+
+_WORDS = ('fast', 'simple', 'powerful', 'files', 'screenshots', 'machine', 'learning', 'notes', 'backup',
+          'menu', 'bar', 'window', 'privacy', 'clipboard', 'workflow', 'design', 'team', 'cloud', 'sync')
+_PLATFORM_WORDS = ('macOS', 'Mac', 'iOS', 'iPhone', 'iPad', 'iPadOS', 'Apple TV', 'watchOS', 'BIOS', 'machine')
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(_WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def generate_detail_page(rng, index):
+    """生成一个结构接近Setapp应用详情页的页面"""
+    name = f"App {index}"
+    paragraphs = ''.join(f"<p>{_sentence(rng, rng.randint(6, 30))}</p>" for _ in range(rng.randint(5, 40)))
+    badges = ', '.join(rng.sample(_PLATFORM_WORDS, rng.randint(1, 3)))
+    links = ''.join(f'<a href="https://setapp.com/apps/other-{rng.randint(0, 999)}">Other</a>'
+                    for _ in range(rng.randint(10, 60)))
+    website = rng.choice([
+        f'<div class="developer-link"><a href="https://www.app{index}.com">Developer</a></div>',
+        f'<a class="external" href="https://twitter.com/app{index}">Twitter</a>'
+        f'<a href="https://app{index}.io/download">Download</a>',
+        ''
+    ])
+    rating = f'<div class="rating">{rng.randint(30, 50) / 10}</div>' if rng.random() < 0.7 else ''
+    return (
+        f'<!doctype html><html><head><title>{name} - Setapp</title>'
+        f'<meta name="description" content="{_sentence(rng, 12)}">'
+        f'<meta property="og:description" content="{_sentence(rng, 8)}">'
+        f'<script>window.__STATE__ = {{"apps": [{index}]}};</script></head>'
+        f'<body><header><nav>{links}</nav></header>'
+        f'<main class="app-page"><h1>{name}</h1>'
+        f'<div class="app-hero"><p>{_sentence(rng, 15)}</p></div>'
+        f'<div class="platform-badge">{badges}</div>{rating}'
+        f'<section class="app-description">{_sentence(rng, 25)}</section>'
+        f'<section class="content">{paragraphs}</section>{website}</main>'
+        f'<footer>{links}</footer></body></html>'
+    )
+
+
+def generate_listing_page(rng, count):
+    """生成含<app-details>标签的应用列表页（parse_html_apps/enhanced_html_parser的输入格式）"""
+    rows = []
+    for index in range(count):
+        platforms = rng.choice(['"Mac"', '"Mac,iOS"', '"iOS"', '"Web"', '"Mac,"'])
+        attributes = [
+            f'name="App {index}"',
+            f'description="{_sentence(rng, 6)}"' if rng.random() < 0.9 else f'description="{_sentence(rng, 3)} &amp; more"',
+            f'icon="https://cdn.setapp.com/icons/{index}.png"',
+            f'url=https://www.app{index}.com',
+            f'platforms={platforms}',
+            f'rating={rng.randint(70, 99)}'
+        ]
+        # 少数标签的属性顺序不同（原来的固定顺序正则会漏掉这些应用）
+        if rng.random() < 0.1:
+            rng.shuffle(attributes)
+        rows.append(
+            f'<app-details {" ".join(attributes)}></app-details>'
+            f'<div class="card">{_sentence(rng, 20)}</div>'
+        )
+    return f"<html><body><main>{''.join(rows)}</main></body></html>"
+
+
+def generate_corpus(count, seed):
+    rng = random.Random(seed)
+    pages = [(f"https://setapp.com/apps/app-{index}", generate_detail_page(rng, index)) for index in range(count)]
+    return pages + EDGE_CASE_PAGES, generate_listing_page(rng, count * 5)
+
+
+# 属性解析的参考实现：parse_html_apps原来对每个标签执行的5次re.search
+def legacy_parse_attributes(attributes):
+    attrs = {}
+    for name, pattern in (('name', r'name="([^"]+)"'), ('description', r'description="([^"]+)"'),
+                          ('url', r'url=([^\s>]+)'), ('platforms', r'platforms=([^\s>]+)'),
+                          ('rating', r'rating=([^\s>]+)')):
+        match = re.search(pattern, attributes)
+        if match:
+            attrs[name] = match.group(1)
+    return attrs
+
+
+# 属性解析的参考实现：enhanced_html_parser原来的固定属性顺序正则
+LEGACY_ENHANCED_RE = re.compile(
+    r'<app-details\s+name="([^"]+)"\s+description="([^"]+)"[^>]*?url=([^\s>]+)[^>]*?platforms=([^\s>]+)[^>]*?>'
+)
+
+LEGACY_TAG_RE = re.compile(r'<app-details\s+([^>]+)>')
+
+TAG_RE = re.compile(APP_DETAILS_TAG_RE.pattern.decode('ascii'))
+
+
+def fingerprint(results):
+    """提取结果的哈希，用于检查不同版本的提取结果是否一致"""
+    data = json.dumps(results, ensure_ascii=False, sort_keys=True, default=lambda obj: obj.__dict__)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()[:16]
+
+
+@contextlib.contextmanager
+def quiet():
+    """屏蔽被测函数的进度输出"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def build_benchmarks(pages, listing_path, listing_count):
+    """返回[(名称, 每轮处理的条目数, 被测函数)]，被测函数返回提取结果"""
+    client = SetappHttpClient(cache=HttpCache(cache_dir=None))
+    scraper = SetappScraperUltimate(client=client, state=ScrapeState(None, fresh=True),
+                                    journal=RunJournal(os.devnull))
+    documents = [html_backend.parse_document(html) for _, html in pages]
+    fields = [APP_DETAIL_ENGINE.extract(document) for document in documents]
+    names = [app_info_for(url)['name'] for url, _ in pages]
+
+    # 描述增强器的文档备忘录预先装满，只测量提取本身
+    enhancer = SetappDescriptionEnhancer(client=client)
+    enhancer.documents = DocumentMemo(dict(pages).get, max_size=len(pages))
+    for url, _ in pages:
+        enhancer.documents.get(url)
+
+    def parse_listing(parse):
+        with quiet():
+            return parse(listing_path)
+
+    with open(listing_path, 'r', encoding='utf-8', errors='replace') as f:
+        listing = f.read()
+
+    return [
+        ('ultimate.extract_fields', len(pages),
+         lambda: [APP_DETAIL_ENGINE.extract(document) for document in documents]),
+        ('ultimate.extract_platform_info', len(pages),
+         lambda: [scraper.extract_platform_info(page.text) for page in fields]),
+        ('ultimate.extract_detailed_description', len(pages),
+         lambda: [scraper.extract_detailed_description(page) for page in fields]),
+        ('ultimate.extract_official_website', len(pages),
+         lambda: [scraper.extract_official_website(page, name) for page, name in zip(fields, names)]),
+        ('enhancer.extract_app_description', len(pages),
+         lambda: [enhancer.extract_app_description(url) for url, _ in pages]),
+        ('parse_html_apps.parse_html_file', listing_count,
+         lambda: parse_listing(parse_html_file)),
+        ('enhanced_html_parser.parse_html_file_enhanced', listing_count,
+         lambda: parse_listing(parse_html_file_enhanced)),
+        ('attributes.parse_tag_attributes', listing_count,
+         lambda: [parse_tag_attributes(attributes) for attributes in TAG_RE.findall(listing)]),
+        ('attributes.legacy_re_search', listing_count,
+         lambda: [legacy_parse_attributes(attributes) for attributes in LEGACY_TAG_RE.findall(listing)]),
+        ('attributes.legacy_enhanced_regex', listing_count,
+         lambda: LEGACY_ENHANCED_RE.findall(listing)),
+    ]
+
+
+def calibrate(func, min_time):
+    """每轮重复调用的次数，使一轮至少持续min_time秒，避免计时太短受噪声影响"""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        if time.perf_counter() - started >= min_time or loops >= 1 << 20:
+            return loops
+        loops *= 2
+
+
+# 分配统计不计入tracemalloc自身和导入机制的分配
+_ALLOCATION_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+)
+
+
+def measure_allocations(func):
+    """在tracemalloc下调用一次func，返回(分配块数, 分配字节数, 内存峰值字节数)
+
+    分配由调用前后两次快照的差计算（按分配位置汇总，只累加增加的部分），
+    即调用结束时仍存活的分配（提取结果、缓存等）；峰值还包括调用中途释放的临时对象。
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot().filter_traces(_ALLOCATION_FILTERS)
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot().filter_traces(_ALLOCATION_FILTERS)
+    finally:
+        tracemalloc.stop()
+    del result
+    blocks = size = 0
+    for stat in after.compare_to(before, 'lineno'):
+        blocks += max(stat.count_diff, 0)
+        size += max(stat.size_diff, 0)
+    return blocks, size, peak - base
+
+
+def run_benchmark(func, items, rounds, warmup, min_time):
+    """返回吞吐量、波动、每条的内存分配、内存峰值和结果哈希"""
+    for _ in range(warmup):
+        func()
+    loops = calibrate(func, min_time)
+
+    timings = []
+    result = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(loops):
+            result = func()
+        timings.append((time.perf_counter() - started) / loops)
+
+    # 内存分配和峰值单独测一轮，tracemalloc本身会拖慢执行
+    blocks, size, peak = measure_allocations(func)
+
+    median = statistics.median(timings)
+    mean = statistics.mean(timings)
+    stdev = statistics.stdev(timings) if len(timings) > 1 else 0.0
+    return {
+        'items': items,
+        'items_per_sec': round(items / median, 1) if median else None,
+        'median_ms': round(median * 1000, 3),
+        'cv_percent': round(stdev / mean * 100, 1) if mean else 0.0,
+        'allocs_per_item': round(blocks / items, 2) if items else None,
+        'alloc_bytes_per_item': round(size / items, 1) if items else None,
+        'peak_kb': round(peak / 1024, 1),
+        'result': fingerprint(result)
+    }
+
+
+# 参与比较的每条分配指标（越大越差）
+ALLOCATION_METRICS = (('allocs_per_item', '分配块数/条'), ('alloc_bytes_per_item', '分配字节/条'))
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """返回回退说明列表；吞吐量下降或每条分配增加超过tolerance、结果哈希变化视为回退"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if current['result'] != previous['result']:
+            regressions.append(f"{name}: 提取结果与基准不一致")
+        if previous.get('items_per_sec') and current['items_per_sec'] < previous['items_per_sec'] * (1 - tolerance):
+            change = (current['items_per_sec'] / previous['items_per_sec'] - 1) * 100
+            regressions.append(f"{name}: 吞吐量 {previous['items_per_sec']} -> {current['items_per_sec']} 条/秒 ({change:+.1f}%)")
+        for metric, label in ALLOCATION_METRICS:
+            # 旧的基准文件没有分配指标，跳过
+            if previous.get(metric) and current[metric] > previous[metric] * (1 + tolerance):
+                change = (current[metric] / previous[metric] - 1) * 100
+                regressions.append(f"{name}: {label} {previous[metric]} -> {current[metric]} ({change:+.1f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="提取器离线基准测试")
+    parser.add_argument('--corpus', default=None,
+                        help='详情页语料目录：HTTP缓存目录或包含*.html的目录（默认按种子生成）')
+    parser.add_argument('--listing', default=None,
+                        help='含<app-details>标签的列表页HTML文件（默认按种子生成）')
+    parser.add_argument('--pages', type=int, default=50, help='生成的详情页数量（默认 50）')
+    parser.add_argument('--seed', type=int, default=20250829, help='生成语料的随机种子')
+    parser.add_argument('--rounds', type=int, default=5, help='每个基准的计时轮数（默认 5）')
+    parser.add_argument('--warmup', type=int, default=1, help='预热轮数（默认 1）')
+    parser.add_argument('--min-time', type=float, default=0.2, help='每轮最短计时秒数（默认 0.2）')
+    parser.add_argument('--only', default=None, help='只运行名称包含该字符串的基准')
+    parser.add_argument('--baseline', default=None, help='与该基准文件比较，出现回退时退出码为1')
+    parser.add_argument('--save-baseline', default=None, help='把本次结果保存为基准文件')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='允许的吞吐量下降和分配增加比例（默认 0.2，即20%%）')
+    html_backend.add_parser_arguments(parser)
+    args = parser.parse_args()
+    html_backend.configure_from_args(args)
+
+    logging.getLogger('setapp_scraper_ultimate').setLevel(logging.WARNING)
+
+    pages, listing = generate_corpus(args.pages, args.seed)
+    if args.corpus:
+        pages = load_corpus(args.corpus)
+        if not pages:
+            print(f"语料为空: {args.corpus}")
+            return 1
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        listing_path = args.listing
+        if not listing_path:
+            listing_path = os.path.join(tmp_dir, 'listing.html')
+            with open(listing_path, 'w', encoding='utf-8') as f:
+                f.write(listing)
+        with quiet():
+            listing_count = len(parse_html_file(listing_path))
+
+        backend = html_backend.default_backend()
+        print(f"语料: {len(pages)} 个详情页, 列表页 {listing_count} 个应用; 解析后端: {backend}")
+        print(f"\n{'基准':<46} {'条/秒':>10} {'中位 ms':>10} {'波动%':>7} "
+              f"{'分配块/条':>10} {'分配B/条':>10} {'峰值 KB':>10}  结果")
+
+        results = {}
+        for name, items, func in build_benchmarks(pages, listing_path, listing_count):
+            if args.only and args.only not in name:
+                continue
+            result = run_benchmark(func, items, args.rounds, args.warmup, args.min_time)
+            results[name] = result
+            print(f"{name:<46} {result['items_per_sec']:>10} {result['median_ms']:>10} "
+                  f"{result['cv_percent']:>7} {result['allocs_per_item']:>10} {result['alloc_bytes_per_item']:>10} "
+                  f"{result['peak_kb']:>10}  {result['result']}")
+
+    # 基准文件按解析后端分别保存，不同后端的结果不互相比较
+    corpus_key = f"{args.corpus or f'generated-v2:{args.pages}:{args.seed}'}|{args.listing or 'generated'}"
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        baseline = saved.get('runs', {}).get(backend, {})
+        if saved.get('corpus') != corpus_key:
+            print(f"\n基准使用的语料不同（{saved.get('corpus')}），无法比较")
+            exit_code = 2
+        elif not baseline:
+            print(f"\n基准文件中没有 {backend} 后端的结果")
+        else:
+            regressions = compare_with_baseline(results, baseline, args.tolerance)
+            if regressions:
+                print("\n发现回退:")
+                for line in regressions:
+                    print(f"  {line}")
+                exit_code = 1
+            else:
+                print(f"\n与基准相比没有回退（容差 {args.tolerance:.0%}）")
+
+    if args.save_baseline:
+        saved = {}
+        if os.path.exists(args.save_baseline):
+            with open(args.save_baseline, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('corpus') != corpus_key:
+                saved = {}
+        saved.update({'version': BASELINE_VERSION, 'corpus': corpus_key, 'python': sys.version.split()[0]})
+        saved.setdefault('runs', {})[backend] = results
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(saved, f, ensure_ascii=False, indent=2)
+        print(f"\n基准已保存到 {args.save_baseline}")
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
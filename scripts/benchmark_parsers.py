@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML解析后端基准测试
+在已保存的页面语料上比较各解析后端的解析速度和提取速度，
+并检查每个后端提取出的应用记录与html.parser完全一致。
+
+语料来源：
+- 默认读取HTTP缓存目录（.http_cache）中保存的应用详情页
+- 也可以用 --corpus 指定一个包含 *.html 文件的目录
+- 语料中总会加入少量边界页面（如内联脚本里出现平台关键词），检查各后端对这些页面的处理也一致
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import time
+
+import html_backend
+from http_cache import HttpCache, DEFAULT_CACHE_DIR
+from http_client import SetappHttpClient
+from run_journal import RunJournal
+from scrape_state import ScrapeState
+from setapp_scraper_ultimate import SetappScraperUltimate
+
+
+# 边界页面：脚本、样式、noscript和template中的平台关键词都不属于页面文本，
+# 各后端都应只识别出徽章中的Mac
+EDGE_CASE_PAGES = [
+    ('https://setapp.com/apps/edge-inline-script',
+     '<!doctype html><html><head><title>Edge Inline Script - Setapp</title>'
+     '<style>.iphone-frame, .ipad-frame {}</style>'
+     '<script>var devices = ["iPhone", "iPad", "Apple Watch", "Apple TV"];</script></head>'
+     '<body><main><h1>Edge Inline Script</h1><div class="platform-badge">Mac</div>'
+     '<noscript>Download for iPhone</noscript><template><p>iPadOS</p></template>'
+     '<section class="app-description">Keeps notes in the menu bar.</section>'
+     '<script type="application/ld+json">{"operatingSystem": "iOS"}</script></main></body></html>'),
+]
+
+
+def load_corpus(path):
+    """返回[(url, html)]；path可以是HTTP缓存目录或HTML文件目录"""
+    pages = []
+    meta_files = sorted(glob.glob(os.path.join(path, 'meta', '*', '*.json')))
+    if meta_files:
+        cache = HttpCache(cache_dir=path)
+        for meta_file in meta_files:
+            with open(meta_file, 'r', encoding='utf-8') as f:
+                url = json.load(f).get('url', '')
+            if '/apps/' not in url:
+                continue
+            entry = cache.load(url)
+            if entry and entry['status'] == 200:
+                pages.append((url, cache.to_response(entry).text))
+    else:
+        for html_file in sorted(glob.glob(os.path.join(path, '*.html'))):
+            with open(html_file, 'r', encoding='utf-8', errors='replace') as f:
+                pages.append((html_file, f.read()))
+    return pages + EDGE_CASE_PAGES if pages else pages
+
+
+def app_info_for(url):
+    slug = url.rstrip('/').split('/')[-1]
+    if slug.endswith('.html'):
+        slug = slug[:-len('.html')]
+    return {'slug': slug, 'name': slug.replace('-', ' ').title(), 'setapp_link': url}
+
+
+def time_best(func, repeat):
+    """多次运行取最短耗时"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def benchmark_backend(backend, pages, repeat):
+    """返回(解析耗时, 解析+提取耗时, 提取出的记录)"""
+    html_backend.configure(backend)
+    parse_time, _ = time_best(lambda: [html_backend.parse_document(html) for _, html in pages], repeat)
+
+    def extract_all():
+        # 每轮使用全新的增量状态，避免复用上次结果而跳过解析
+        scraper = SetappScraperUltimate(client=SetappHttpClient(cache=HttpCache(cache_dir=None)),
+                                        state=ScrapeState(None, fresh=True),
+                                        journal=RunJournal(os.devnull))
+        return [scraper.extract_enhanced_app_details(app_info_for(url), html) for url, html in pages]
+
+    extract_time, records = time_best(extract_all, repeat)
+    return parse_time, extract_time, records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML解析后端基准测试")
+    parser.add_argument('--corpus', default=DEFAULT_CACHE_DIR,
+                        help=f'页面语料目录：HTTP缓存目录或包含*.html的目录（默认 {DEFAULT_CACHE_DIR}）')
+    parser.add_argument('--repeat', type=int, default=3, help='每个后端重复次数，取最短耗时（默认 3）')
+    args = parser.parse_args()
+
+    logging.getLogger('setapp_scraper_ultimate').setLevel(logging.WARNING)
+
+    pages = load_corpus(args.corpus)
+    if not pages:
+        print(f"语料为空: {args.corpus}")
+        return 1
+    total_bytes = sum(len(html.encode('utf-8')) for _, html in pages)
+    print(f"语料: {len(pages)} 个页面, {total_bytes / 1024 / 1024:.1f} MB")
+    print(f"可用后端: {', '.join(html_backend.available_backends())}")
+
+    baseline_records = None
+    mismatched = False
+    print(f"\n{'后端':<12} {'解析 ms/页':>12} {'解析+提取 ms/页':>16} {'页/秒':>10}  结果一致")
+    for backend in html_backend.available_backends():
+        parse_time, extract_time, records = benchmark_backend(backend, pages, args.repeat)
+        if baseline_records is None:
+            baseline_records = records
+            identical = '基准'
+        else:
+            diffs = [url for (url, _), a, b in zip(pages, baseline_records, records) if a != b]
+            identical = '是' if not diffs else f"否（{len(diffs)} 个页面不同，如 {diffs[0]}）"
+            mismatched = mismatched or bool(diffs)
+        print(f"{backend:<12} {parse_time / len(pages) * 1000:>12.2f} "
+              f"{extract_time / len(pages) * 1000:>16.2f} {len(pages) / extract_time:>10.1f}  {identical}")
+
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
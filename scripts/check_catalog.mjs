@@ -0,0 +1,40 @@
+#!/usr/bin/env node
+// 构建前检查 public/apps_catalog.json.gz 是否由当前的 apps_list_enhanced_descriptions.csv 生成：
+// 目录中记录的CSV SHA-256 与当前CSV不一致（CSV改动后未重新生成目录）时构建失败，
+// 需运行 `npm run catalog` 重新生成。前端因此可以直接使用目录，不必再下载和校验CSV。
+import { createHash } from 'node:crypto';
+import { readFileSync } from 'node:fs';
+import { dirname, join } from 'node:path';
+import { fileURLToPath } from 'node:url';
+import { gunzipSync } from 'node:zlib';
+
+// 与 scripts/app_catalog.py 的 CATALOG_SCHEMA_VERSION 保持一致
+const CATALOG_SCHEMA_VERSION = 1;
+
+const publicDir = join(dirname(fileURLToPath(import.meta.url)), '..', 'public');
+const csvPath = join(publicDir, 'apps_list_enhanced_descriptions.csv');
+const catalogPath = join(publicDir, 'apps_catalog.json.gz');
+
+const fail = (message) => {
+  console.error(`❌ ${message}`);
+  console.error('   请运行 `npm run catalog` 重新生成目录');
+  process.exit(1);
+};
+
+let catalog;
+try {
+  catalog = JSON.parse(gunzipSync(readFileSync(catalogPath)).toString('utf-8'));
+} catch (error) {
+  fail(`无法读取目录 ${catalogPath}: ${error.message}`);
+}
+
+if (catalog.schema?.version !== CATALOG_SCHEMA_VERSION) {
+  fail(`目录schema版本 ${catalog.schema?.version} 与前端支持的 ${CATALOG_SCHEMA_VERSION} 不一致`);
+}
+
+const digest = createHash('sha256').update(readFileSync(csvPath)).digest('hex');
+if (catalog.source?.sha256 !== digest) {
+  fail(`目录已过期：记录的CSV哈希 ${catalog.source?.sha256 ?? '（无）'}，当前CSV为 ${digest}`);
+}
+
+console.log(`✅ 目录与CSV一致（${catalog.count} 个应用）`);
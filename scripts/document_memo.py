@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面文档备忘录
+同一次运行中，同一个URL只下载并解析一次，多个提取函数共用同一棵解析树。
+使用有界LRU防止内存无限增长，调用方处理完一个页面后也可以显式淘汰。
+"""
+
+import threading
+from collections import OrderedDict
+
+from html_backend import parse_document
+
+
+class DocumentMemo:
+    """按URL缓存解析后的文档（线程安全的LRU）
+
+    fetch(url)返回HTML文本或None，parse(html)返回解析树。
+    获取失败的结果（None）同样会被记住，避免同一次运行中反复请求。
+    """
+
+    def __init__(self, fetch, parse=parse_document, max_size=16):
+        self.fetch = fetch
+        self.parse = parse
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._documents = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        """返回URL对应的解析树，获取失败时返回None"""
+        with self._lock:
+            if url in self._documents:
+                self._documents.move_to_end(url)
+                self.hits += 1
+                return self._documents[url]
+            self.misses += 1
+
+        html = self.fetch(url)
+        document = self.parse(html) if html else None
+
+        with self._lock:
+            self._documents[url] = document
+            self._documents.move_to_end(url)
+            while len(self._documents) > self.max_size:
+                self._documents.popitem(last=False)
+        return document
+
+    def evict(self, url):
+        """显式淘汰一个URL（该页面的所有提取都已完成时调用）"""
+        with self._lock:
+            self._documents.pop(url, None)
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+
+    def summary(self):
+        return f"文档备忘录: 解析 {self.misses} 次, 复用 {self.hits} 次"
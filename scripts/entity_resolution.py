@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+应用实体解析
+不同来源对同一应用的写法不同：slug转换的标题（"Cleanshot X"）、详情页h1（"CleanShot X"）、
+列表页<app-details name>。这里把所有记录链接到同一个规范应用ID：
+1. Setapp slug相同即为同一应用（slug取自链接或直接给出）
+2. 规范化名称（NFKC、忽略大小写、去掉空白和标点）相同即为同一应用，slug本身也按名称登记
+3. 否则做模糊匹配：先用字符三元组分桶（blocking）找出候选，只在候选中按Dice相似度比较，
+   避免所有记录两两比较；两边都有slug且不同的不会被合并。
+   达到阈值的候选至少与记录共享一定数量的三元组，因此只需查看记录中最稀有的几个三元组的桶（前缀过滤）
+规范ID优先使用slug，没有slug时由名称生成。
+"""
+
+import math
+import re
+import unicodedata
+
+# 模糊匹配所需的最低Dice相似度
+DEFAULT_THRESHOLD = 0.85
+
+NGRAM_SIZE = 3
+
+_SLUG_RE = re.compile(r'/apps/([a-zA-Z0-9-]+)/?(?:[?#].*)?$')
+_WORD_RE = re.compile(r'[^\W_]+')
+
+
+def name_words(name):
+    """名称 -> 规范化的单词列表"""
+    return _WORD_RE.findall(unicodedata.normalize('NFKC', name or '').casefold())
+
+
+def name_key(name):
+    """规范化名称键：单词直接相连，"CleanShot X"、"Cleanshot X"、"cleanshot-x"得到同一个键"""
+    return ''.join(name_words(name))
+
+
+def slug_from_url(url):
+    """Setapp链接 -> slug，不是应用详情页链接时返回None"""
+    match = _SLUG_RE.search(url or '')
+    return match.group(1).lower() if match else None
+
+
+def _ngrams(key, size=NGRAM_SIZE):
+    padded = f" {key} "
+    return {padded[i:i + size] for i in range(max(len(padded) - size + 1, 1))}
+
+
+class EntityResolver:
+    """增量的应用实体解析器：逐条登记记录，返回实体编号"""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._slugs = []
+        self._names = []
+        self._by_slug = {}
+        self._by_key = {}
+        self._key_grams = {}
+        self._buckets = {}
+        self.exact_matches = 0
+        self.fuzzy_matches = 0
+
+    def __len__(self):
+        return len(self._names)
+
+    def _register_key(self, key, entity):
+        if not key or key in self._by_key:
+            return
+        self._by_key[key] = entity
+        grams = self._key_grams[key] = frozenset(_ngrams(key))
+        for gram in grams:
+            self._buckets.setdefault(gram, []).append(key)
+
+    def _fuzzy_candidate(self, key, slug):
+        """在共享三元组的候选中找出最相似的实体，没有达到阈值时返回None"""
+        grams = _ngrams(key)
+        size = len(grams)
+        # Dice >= t 要求共享至少 t*n/(2-t) 个三元组，候选必然出现在最稀有的 n-该数量+1 个桶中；
+        # 三元组数量超出[t*n/(2-t), n*(2-t)/t]的键也不可能达到阈值
+        min_shared = math.ceil(self.threshold * size / (2 - self.threshold))
+        max_size = size * (2 - self.threshold) / self.threshold
+        buckets = sorted((self._buckets.get(gram, ()) for gram in grams), key=len)
+        candidates = set()
+        for bucket in buckets[:max(size - min_shared + 1, 1)]:
+            candidates.update(bucket)
+
+        best, best_score = None, self.threshold
+        for candidate in candidates:
+            candidate_grams = self._key_grams[candidate]
+            candidate_size = len(candidate_grams)
+            if candidate_size < min_shared or candidate_size > max_size:
+                continue
+            score = 2 * len(grams & candidate_grams) / (size + candidate_size)
+            if score < best_score:
+                continue
+            entity = self._by_key[candidate]
+            # 相似度相同时取较早登记的实体，结果与集合的遍历顺序无关
+            if best is not None and score == best_score and entity >= best:
+                continue
+            # 两条记录都有slug且不同，说明是Setapp上的两个应用
+            if slug and self._slugs[entity] and self._slugs[entity] != slug:
+                continue
+            best, best_score = entity, score
+        return best
+
+    def resolve(self, name=None, slug=None, url=None):
+        """登记一条记录并返回其实体编号（同一实体的记录编号相同）"""
+        slug = (slug or slug_from_url(url) or '').lower() or None
+        key = name_key(name)
+        slug_key = name_key(slug)
+
+        entity = self._by_slug.get(slug) if slug else None
+        if entity is None:
+            for candidate_key in (key, slug_key):
+                candidate = self._by_key.get(candidate_key) if candidate_key else None
+                if candidate is not None and not (slug and self._slugs[candidate] and self._slugs[candidate] != slug):
+                    entity = candidate
+                    break
+        if entity is not None:
+            self.exact_matches += 1
+        elif key or slug_key:
+            entity = self._fuzzy_candidate(key or slug_key, slug)
+            if entity is not None:
+                self.fuzzy_matches += 1
+
+        if entity is None:
+            entity = len(self._names)
+            self._slugs.append(None)
+            self._names.append(name or slug or '')
+        if slug and self._slugs[entity] is None:
+            self._slugs[entity] = slug
+            self._by_slug[slug] = entity
+        self._register_key(key, entity)
+        self._register_key(slug_key, entity)
+        return entity
+
+    def canonical_ids(self):
+        """所有实体的规范ID列表（按实体编号）：优先slug，否则由名称生成，重复时加序号"""
+        ids = []
+        used = {slug for slug in self._slugs if slug}
+        for slug, name in zip(self._slugs, self._names):
+            if slug:
+                ids.append(slug)
+                continue
+            base = '-'.join(name_words(name)) or 'app'
+            canonical = base
+            suffix = 2
+            while canonical in used:
+                canonical = f"{base}-{suffix}"
+                suffix += 1
+            used.add(canonical)
+            ids.append(canonical)
+        return ids
+
+    def summary(self):
+        return f"实体解析: {len(self)} 个应用, 精确链接 {self.exact_matches}, 模糊链接 {self.fuzzy_matches}"
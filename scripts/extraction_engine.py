@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单次遍历的应用详情提取引擎
+原来的提取流程对每个字段分别执行多次select()和get_text()，每次都要遍历整棵树。
+这里把所有选择器预先编译成规则，只遍历一次文档：
+- 进入元素时记录当前文本片段位置，离开时即可得到该元素的文本，不需要再次遍历子树
+- 祖先条件（如 ".app-hero p"）通过维护已打开的祖先计数判断
+- 整页文本在同一次遍历中拼接得到（元素之间以空格分隔）
+提取结果与原来逐个选择器查询的结果保持一致（包括各选择器的优先顺序）。
+"""
+
+import re
+from collections import Counter
+
+from bs4.element import Tag, NavigableString, CData
+
+from html_backend import FastNode, NON_TEXT_TAGS
+
+# 与BeautifulSoup的get_text()一致：只收集普通文本和CDATA，忽略注释、script/style内容等
+_SOUP_TEXT_TYPES = (NavigableString, CData)
+
+# noscript中的文本BeautifulSoup仍会收集，这里与selectolax后端一样跳过整个子树
+_SKIPPED_TAGS = frozenset(NON_TEXT_TAGS)
+
+_SIMPLE_SELECTOR_RE = re.compile(
+    r'^(?P<tag>[a-zA-Z][a-zA-Z0-9-]*)?'
+    r'(?:\.(?P<cls>[a-zA-Z0-9_-]+))?'
+    r'(?:\[(?P<attr>[a-zA-Z-]+)(?:(?P<op>\*?=)"(?P<value>[^"]*)")?\])?$'
+)
+
+
+def _identity(text):
+    return text
+
+
+class SimpleSelector:
+    """tag / .class / tag[attr="v"] / [attr*="v"] 形式的简单选择器"""
+
+    __slots__ = ('tag', 'cls', 'attr', 'op', 'value')
+
+    def __init__(self, text):
+        match = _SIMPLE_SELECTOR_RE.match(text)
+        if not match or not any(match.group('tag', 'cls', 'attr')):
+            raise ValueError(f"提取引擎不支持的选择器: {text}")
+        self.tag = match.group('tag')
+        self.cls = match.group('cls')
+        self.attr = match.group('attr')
+        self.op = match.group('op')
+        self.value = match.group('value')
+
+    def matches(self, tag, classes, attrs):
+        if self.tag and self.tag != tag:
+            return False
+        if self.cls and self.cls not in classes:
+            return False
+        if self.attr:
+            actual = attrs.get(self.attr)
+            if actual is None:
+                return False
+            if self.op == '=' and actual != self.value:
+                return False
+            if self.op == '*=' and self.value not in actual:
+                return False
+        return True
+
+    @property
+    def context_key(self):
+        """作为祖先条件时使用的键（只支持tag或.class）"""
+        if self.attr or (self.tag and self.cls):
+            raise ValueError("祖先条件只支持单个标签或类名")
+        return ('tag', self.tag) if self.tag else ('class', self.cls)
+
+
+class Rule:
+    """编译后的选择器：可选的祖先条件 + 目标元素条件"""
+
+    __slots__ = ('text', 'ancestor', 'target')
+
+    def __init__(self, text):
+        parts = text.split()
+        if len(parts) > 2:
+            raise ValueError(f"提取引擎不支持的选择器: {text}")
+        self.text = text
+        self.ancestor = SimpleSelector(parts[0]).context_key if len(parts) == 2 else None
+        self.target = SimpleSelector(parts[-1])
+
+    def matches(self, tag, classes, attrs, open_contexts):
+        if not self.target.matches(tag, classes, attrs):
+            return False
+        return self.ancestor is None or self.ancestor in open_contexts
+
+
+class PageFields:
+    """一次遍历收集到的原始字段"""
+
+    def __init__(self, rule_counts):
+        self.text = ''
+        # 每个规则组内：规则序号 -> 按文档顺序排列的匹配结果
+        self.matches = {name: [[] for _ in range(count)] for name, count in rule_counts.items()}
+
+    def ordered(self, name):
+        """按规则优先顺序、再按文档顺序展开某个规则组的匹配结果"""
+        return [value for per_rule in self.matches[name] for value in per_rule]
+
+    def first_per_rule(self, name):
+        """每个规则的第一个匹配结果（相当于逐个select_one）"""
+        return [per_rule[0] if per_rule else None for per_rule in self.matches[name]]
+
+
+class ExtractionEngine:
+    """单次遍历文档，按编译后的规则组收集字段
+
+    rule_groups: {组名: (选择器列表, 取值方式)}，取值方式为'text'或属性名；
+    额外的'links'组收集所有带href的链接（href, 链接文本）。
+
+    BeautifulSoup文档在Python中遍历一次（soupsieve的每次select都是一次
+    纯Python的整树遍历）；selectolax的选择器匹配在C中完成，逐条规则查询
+    反而比Python层的单次遍历快，因此直接用编译好的规则做原生查询。
+    """
+
+    def __init__(self, rule_groups):
+        self.rule_counts = {}
+        self.context_keys = set()
+        # 按目标元素的标签/类名建立规则索引，每个元素只检查可能匹配的规则；
+        # 只有属性条件的规则（如 [class*="rating"]）每个元素都要检查
+        self.rules_by_tag = {}
+        self.rules_by_class = {}
+        self.generic_rules = []
+        self.rules = []
+        for name, (selectors, value_from) in rule_groups.items():
+            self.rule_counts[name] = len(selectors)
+            for index, selector in enumerate(selectors):
+                rule = Rule(selector)
+                entry = (rule, name, index, value_from)
+                if rule.ancestor is not None:
+                    self.context_keys.add(rule.ancestor)
+                if rule.target.tag:
+                    self.rules_by_tag.setdefault(rule.target.tag, []).append(entry)
+                elif rule.target.cls:
+                    self.rules_by_class.setdefault(rule.target.cls, []).append(entry)
+                else:
+                    self.generic_rules.append(entry)
+                self.rules.append(entry)
+
+    def matching_rules(self, tag, attrs, open_contexts):
+        """返回匹配该元素的规则 [(组名, 规则序号, 取值方式)]"""
+        classes = dict.fromkeys(attrs.get('class', '').split())
+        candidates = list(self.rules_by_tag.get(tag, ()))
+        for cls in classes:
+            candidates.extend(self.rules_by_class.get(cls, ()))
+        candidates.extend(self.generic_rules)
+        return [(name, index, value_from) for rule, name, index, value_from in candidates
+                if rule.matches(tag, classes, attrs, open_contexts)]
+
+    def element_contexts(self, tag, attrs):
+        """该元素作为祖先时满足的祖先条件"""
+        keys = []
+        if ('tag', tag) in self.context_keys:
+            keys.append(('tag', tag))
+        for cls in attrs.get('class', '').split():
+            if ('class', cls) in self.context_keys:
+                keys.append(('class', cls))
+        return keys
+
+    def extract(self, document):
+        """遍历一次文档，返回PageFields"""
+        fields = PageFields(self.rule_counts)
+        fields.matches['links'] = [[]]
+        if isinstance(document, FastNode):
+            self._extract_fast(document._node, fields)
+        else:
+            self._extract_soup(document, fields)
+        return fields
+
+    def _extract_soup(self, root, fields):
+        links = fields.matches['links'][0]
+        chunks = []
+        # 当前已打开的祖先条件（计数归零即删除，便于用in判断）
+        open_contexts = Counter()
+
+        # 每个已打开元素一帧：[(结果列表, 位置, 取值函数)]
+        # 匹配时先按文档顺序占位，离开元素时再填入它的文本
+        frames = []
+        for event, tag, attrs, start in self._walk_soup(root, chunks):
+            if event == 'exit':
+                for key in self.element_contexts(tag, attrs):
+                    open_contexts[key] -= 1
+                    if not open_contexts[key]:
+                        del open_contexts[key]
+                pending = frames.pop()
+                if pending:
+                    text = ''.join(chunks[start:])
+                    for target, position, transform in pending:
+                        target[position] = transform(text)
+                continue
+
+            pending = []
+            for name, index, value_from in self.matching_rules(tag, attrs, open_contexts):
+                target = fields.matches[name][index]
+                if value_from == 'text':
+                    pending.append((target, len(target), _identity))
+                    target.append(None)
+                else:
+                    target.append(attrs.get(value_from, ''))
+            if tag == 'a' and 'href' in attrs:
+                pending.append((links, len(links), lambda text, href=attrs['href']: (href, text)))
+                links.append(None)
+            frames.append(pending)
+            for key in self.element_contexts(tag, attrs):
+                open_contexts[key] += 1
+
+        # 整页文本在元素边界处用空格分隔（相当于get_text(' ')），
+        # 相邻元素的文本不会粘连成"PasteMac"、"macOSiOS"
+        fields.text = ' '.join(chunks)
+
+    def _extract_fast(self, root, fields):
+        for rule, name, index, value_from in self.rules:
+            target = fields.matches[name][index]
+            for node in root.css(rule.text):
+                if value_from == 'text':
+                    target.append(node.text(deep=True))
+                else:
+                    target.append(node.attributes.get(value_from) or '')
+        links = fields.matches['links'][0]
+        for node in root.css('a[href]'):
+            links.append((node.attributes.get('href') or '', node.text(deep=True)))
+        fields.text = root.text(deep=True, separator=' ')
+
+    @staticmethod
+    def _walk_soup(root, chunks):
+        """遍历BeautifulSoup树，产生('enter'/'exit', 标签, 属性, 文本起点)事件"""
+        stack = [(root, iter(root.contents), len(chunks), None)]
+        while stack:
+            element, children, start, attrs = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                if attrs is not None:
+                    yield 'exit', element.name, attrs, start
+                continue
+            if isinstance(child, Tag):
+                if child.name in _SKIPPED_TAGS:
+                    continue
+                child_attrs = {key: ' '.join(value) if isinstance(value, list) else value
+                               for key, value in child.attrs.items()}
+                child_start = len(chunks)
+                yield 'enter', child.name, child_attrs, child_start
+                stack.append((child, iter(child.contents), child_start, child_attrs))
+            elif type(child) in _SOUP_TEXT_TYPES:
+                chunks.append(str(child))
+
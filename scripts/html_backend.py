@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+可切换的HTML解析后端
+- html.parser：Python内置，最慢，但不需要额外依赖
+- lxml：BeautifulSoup + lxml，同样的API，解析快数倍（需要 pip install lxml）
+- selectolax：基于lexbor的快速解析器（需要 pip install selectolax），
+  通过FastDocument/FastNode适配爬虫实际用到的那部分BeautifulSoup接口：
+  select/select_one/find/find_all/get/get_text/name
+默认使用html.parser，可以通过 --parser 参数或 configure() 指定（auto：已安装的最快后端）。
+selectolax文档在解析后去掉script/style/noscript/template节点，文本与BeautifulSoup的get_text()一致，
+不会把内联脚本中的关键词当作页面内容。
+"""
+
+import re
+
+from bs4 import BeautifulSoup
+from bs4.element import NavigableString, CData
+
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    HAS_SELECTOLAX = False
+
+BACKENDS = ('html.parser', 'lxml', 'selectolax')
+
+DEFAULT_BACKEND = 'html.parser'
+
+# 内容不属于页面文本的元素
+NON_TEXT_TAGS = ('script', 'style', 'noscript', 'template')
+
+
+def available_backends():
+    """当前环境中可用的解析后端"""
+    backends = ['html.parser']
+    if HAS_LXML:
+        backends.append('lxml')
+    if HAS_SELECTOLAX:
+        backends.append('selectolax')
+    return backends
+
+
+def best_backend():
+    return available_backends()[-1]
+
+
+_default_backend = DEFAULT_BACKEND
+
+
+def configure(backend):
+    """设置全局默认解析后端，'auto'表示使用已安装的最快后端"""
+    global _default_backend
+    if backend == 'auto':
+        backend = best_backend()
+    if backend not in available_backends():
+        raise ValueError(f"解析后端不可用: {backend}（可用: {', '.join(available_backends())}）")
+    _default_backend = backend
+
+
+def default_backend():
+    return _default_backend
+
+
+def parse_document(content, backend=None):
+    """用指定（或默认）后端解析HTML，返回BeautifulSoup或兼容的FastDocument"""
+    backend = backend or _default_backend
+    if backend == 'selectolax':
+        return FastDocument(content)
+    return BeautifulSoup(content, backend)
+
+
+class FastNode:
+    """selectolax节点的BeautifulSoup风格包装"""
+
+    __slots__ = ('_node',)
+
+    def __init__(self, node):
+        self._node = node
+
+    @property
+    def name(self):
+        return self._node.tag
+
+    def get(self, attr, default=None):
+        value = self._node.attributes.get(attr)
+        return default if value is None else value
+
+    def get_text(self, separator=''):
+        return self._node.text(deep=True, separator=separator)
+
+    def select(self, selector):
+        return [FastNode(node) for node in self._node.css(selector)]
+
+    def select_one(self, selector):
+        node = self._node.css_first(selector)
+        return FastNode(node) if node is not None else None
+
+    def find_all(self, name=None, href=None):
+        """支持爬虫用到的两种形式：find_all('a', href=True) 和 find_all('a', href=re.compile(...))"""
+        nodes = self._node.css(name or '*')
+        if href is None:
+            return [FastNode(node) for node in nodes]
+        result = []
+        for node in nodes:
+            value = node.attributes.get('href')
+            if value is None:
+                continue
+            if href is True or (isinstance(href, re.Pattern) and href.search(value)) or href == value:
+                result.append(FastNode(node))
+        return result
+
+    def find(self, name=None, href=None):
+        if href is None:
+            return self.select_one(name or '*')
+        matches = self.find_all(name, href=href)
+        return matches[0] if matches else None
+
+
+class FastDocument(FastNode):
+    """selectolax文档，接口与FastNode相同，作用于整棵树"""
+
+    __slots__ = ('_tree',)
+
+    def __init__(self, content):
+        self._tree = LexborHTMLParser(content)
+        # lexbor的text()会包含脚本和样式的内容，BeautifulSoup的get_text()不会
+        self._tree.strip_tags(list(NON_TEXT_TAGS))
+        super().__init__(self._tree.root)
+
+
+def page_text(document, separator=' '):
+    """文档（或元素）的文本，各后端一致：元素之间以separator分隔，不含NON_TEXT_TAGS中的内容"""
+    if isinstance(document, FastNode):
+        return document.get_text(separator)
+    return separator.join(
+        str(string) for string in document.find_all(string=True)
+        if type(string) in (NavigableString, CData)
+        and not any(parent.name in NON_TEXT_TAGS for parent in string.parents)
+    )
+
+
+def add_parser_arguments(parser):
+    """为命令行脚本添加解析后端参数"""
+    parser.add_argument('--parser', choices=('auto',) + BACKENDS, default=DEFAULT_BACKEND,
+                        help=f'HTML解析后端（默认 {DEFAULT_BACKEND}；auto：使用已安装的最快后端）')
+
+
+def configure_from_args(args):
+    configure(args.parser)
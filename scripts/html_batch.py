@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量解析保存的Setapp列表页快照
+- 输入可以是目录（其中的*.html/*.htm）、通配符或文件，按修改时间从旧到新排序
+- 各文件在进程池中并行解析，结果按输入顺序逐个返回
+- 按名称/官网去重合并：同一应用以最新快照的字段为准，位置保留第一次出现的位置
+"""
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+HTML_SUFFIXES = ('.html', '.htm')
+
+
+def expand_inputs(inputs):
+    """目录/通配符/文件 -> 去重后的文件列表（按修改时间从旧到新）"""
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.update(os.path.join(item, name) for name in os.listdir(item)
+                         if name.lower().endswith(HTML_SUFFIXES))
+        elif glob.has_magic(item):
+            paths.update(path for path in glob.glob(item, recursive=True) if os.path.isfile(path))
+        elif os.path.isfile(item):
+            paths.add(item)
+        else:
+            print(f"跳过不存在的输入: {item}")
+    return sorted(paths, key=lambda path: (os.path.getmtime(path), path))
+
+
+def record_key(record):
+    """去重键：规范化的名称和官网"""
+    name = ' '.join(record.get('名称', '').split()).lower()
+    url = record.get('官方网站', '').strip().lower().rstrip('/')
+    return name, url
+
+
+def _parse_one(task):
+    """进程池中执行：解析一个文件，返回(文件, 记录列表, 错误)"""
+    iter_records, path = task
+    try:
+        return path, list(iter_records(path)), None
+    except Exception as e:
+        return path, [], str(e)
+
+
+def parse_html_batch(inputs, iter_records, workers=None):
+    """并行解析多个快照并去重合并，返回合并后的记录列表
+
+    iter_records：模块级的生成器函数（如parse_html_apps.iter_html_apps），
+    必须能被pickle传给子进程。
+    """
+    paths = expand_inputs(inputs)
+    print(f"共 {len(paths)} 个HTML文件")
+    if not paths:
+        return []
+
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    tasks = [(iter_records, path) for path in paths]
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_parse_one, tasks)
+    else:
+        executor = None
+        results = map(_parse_one, tasks)
+
+    merged = {}
+    total = 0
+    try:
+        for index, (path, records, error) in enumerate(results, 1):
+            if error:
+                print(f"[{index}/{len(paths)}] 解析失败: {path} - {error}")
+                continue
+            print(f"[{index}/{len(paths)}] {os.path.basename(path)}: {len(records)} 个应用")
+            total += len(records)
+            for record in records:
+                # 字典保留第一次插入的位置，更新值不改变顺序
+                merged[record_key(record)] = record
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    print(f"合并 {total} 条记录，去重后 {len(merged)} 个应用")
+    return list(merged.values())
+
+
+def add_batch_arguments(parser):
+    """为HTML解析脚本添加批量模式参数"""
+    parser.add_argument('inputs', nargs='*',
+                        help='要解析的HTML快照：目录、通配符或文件（可多个；不指定时解析默认文件）')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='并行解析的进程数（默认CPU核数）')
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP录制/回放归档
+--record：把一次运行中返回给爬虫的每个HTTP响应（含缓存回放和部分下载的结果）追加写入归档文件；
+--replay：共享HTTP客户端只从归档取响应，不访问网络、不等待速率控制，
+         整条流水线以CPU速度重跑，结果可在离线构建机上复现。
+
+归档格式类似.warc.gz：每个响应是一行JSON，单独压缩成一个gzip成员追加到文件末尾。
+gzip允许多个成员首尾相接，整个文件可直接用gzip.open/zcat读取；
+每条记录写完即落盘，运行中断时已写入的记录仍然完整可用。
+"""
+
+import base64
+import gzip
+import json
+import logging
+import threading
+import time
+
+from http_cache import CachedResponse
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_VERSION = 1
+
+
+class ArchivedResponse(CachedResponse):
+    """从归档回放的响应"""
+
+    def __init__(self, url, status_code, headers, content, encoding, truncated=False):
+        super().__init__(url, status_code, headers, content, encoding)
+        self.truncated = truncated
+
+
+class HttpArchive:
+    """录制或回放HTTP响应的归档文件（线程安全）
+
+    replay=False时为录制模式，首次写入时创建（覆盖）文件；
+    replay=True时读入整个归档，同一URL有多条记录时以最后一条为准。
+    """
+
+    def __init__(self, path, replay=False):
+        self.path = path
+        self.replaying = replay
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        self._entries = {}
+        self._file = None
+        self._lock = threading.Lock()
+        if replay:
+            self.load()
+
+    def load(self):
+        """读取归档；末尾因中断而不完整的gzip成员或JSON行直接跳过"""
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            try:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self._entries[entry['url']] = entry
+                    except (ValueError, KeyError, TypeError):
+                        continue
+            except (EOFError, OSError) as e:
+                logger.warning(f"归档末尾不完整，已读取 {len(self._entries)} 条: {self.path} - {e}")
+        logger.info(f"已载入归档 {self.path}: {len(self._entries)} 个URL")
+
+    def record(self, url, response):
+        """追加一条响应记录"""
+        content = response.content
+        entry = {
+            'version': ARCHIVE_VERSION,
+            'url': url,
+            'status': response.status_code,
+            'headers': dict(response.headers),
+            'encoding': response.encoding,
+            'truncated': getattr(response, 'truncated', False),
+            'recorded_at': time.time()
+        }
+        # 文本正文直接保存，便于用zcat查看；无法按UTF-8解码的正文用base64保存
+        try:
+            entry['body'] = content.decode('utf-8')
+        except UnicodeDecodeError:
+            entry['body_base64'] = base64.b64encode(content).decode('ascii')
+        member = gzip.compress((json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8'))
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'wb')
+            self._file.write(member)
+            self._file.flush()
+            self.recorded += 1
+
+    def replay(self, url):
+        """返回URL对应的归档响应，未录制时返回None"""
+        entry = self._entries.get(url)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.replayed += 1
+        if 'body_base64' in entry:
+            content = base64.b64decode(entry['body_base64'])
+        else:
+            content = entry['body'].encode('utf-8')
+        return ArchivedResponse(url, entry['status'], entry['headers'], content, entry.get('encoding'),
+                                entry.get('truncated', False))
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def summary(self):
+        if self.replaying:
+            return f"归档回放: 命中 {self.replayed}, 未录制 {self.misses}"
+        return f"归档录制: {self.recorded} 个响应 -> {self.path}"
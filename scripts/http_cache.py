@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Setapp爬虫共享的磁盘HTTP响应缓存
+- 以URL为键保存响应元数据（状态码、ETag、Last-Modified）
+- 响应正文按内容哈希存放，相同页面只保存一份
+- 再次请求时发送If-None-Match/If-Modified-Since进行条件验证，304时直接复用缓存
+- 离线模式下只从缓存回放，不发起任何网络请求
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import requests
+
+DEFAULT_CACHE_DIR = '.http_cache'
+
+# 这些状态码的响应值得缓存（404/410表示页面确实不存在，离线回放时同样需要）
+CACHEABLE_STATUS_CODES = {200, 203, 404, 410}
+
+
+class CacheMissError(requests.exceptions.RequestException):
+    """离线模式下缓存未命中"""
+
+
+class CachedResponse:
+    """从缓存回放的响应，提供与requests.Response相同的常用属性"""
+
+    from_cache = True
+
+    def __init__(self, url, status_code, headers, content, encoding):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error (cached) for url: {self.url}", response=self)
+
+
+class HttpCache:
+    """内容寻址的磁盘HTTP缓存
+
+    cache_dir为None时禁用缓存，get()直接透传给session。
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, offline=False):
+        self.cache_dir = cache_dir
+        self.offline = offline
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(os.path.join(cache_dir, 'meta'), exist_ok=True)
+            os.makedirs(os.path.join(cache_dir, 'bodies'), exist_ok=True)
+
+    @property
+    def enabled(self):
+        return bool(self.cache_dir)
+
+    def _meta_path(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, 'meta', key[:2], f"{key}.json")
+
+    def _body_path(self, digest):
+        return os.path.join(self.cache_dir, 'bodies', digest[:2], digest)
+
+    def _count(self, name):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _write_atomic(self, path, data):
+        """先写临时文件再替换，避免并发写入或中断留下半个文件"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{time.monotonic_ns()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def has(self, url):
+        """是否已缓存该URL（只检查元数据文件是否存在）"""
+        return self.enabled and os.path.exists(self._meta_path(url))
+
+    def load_meta(self, url):
+        """只读取URL对应缓存条目的元数据（不含正文），不存在、已损坏或正文缺失时返回None"""
+        if not self.enabled:
+            return None
+        try:
+            with open(self._meta_path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            if not os.path.exists(self._body_path(entry['body_sha256'])):
+                return None
+            return entry
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def open_body(self, entry):
+        """以二进制文件打开缓存条目的正文，用于流式读取而不整体载入内存"""
+        return open(self._body_path(entry['body_sha256']), 'rb')
+
+    def load(self, url):
+        """读取URL对应的缓存条目，不存在或已损坏时返回None"""
+        entry = self.load_meta(url)
+        if entry is None:
+            return None
+        try:
+            with self.open_body(entry) as f:
+                entry['content'] = f.read()
+            return entry
+        except OSError:
+            return None
+
+    def store(self, url, response):
+        """保存响应正文和元数据"""
+        if not self.enabled or response.status_code not in CACHEABLE_STATUS_CODES:
+            return
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        body_path = self._body_path(digest)
+        if not os.path.exists(body_path):
+            self._write_atomic(body_path, content)
+        self._store_meta(url, response, digest)
+
+    def store_stream(self, url, response, chunks):
+        """边读边保存正文（chunks为正文块的迭代器），内存占用与正文大小无关，返回缓存条目的元数据"""
+        tmp_path = os.path.join(self.cache_dir, 'bodies', f"stream.{os.getpid()}.{time.monotonic_ns()}.tmp")
+        digest = hashlib.sha256()
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    f.write(chunk)
+            body_path = self._body_path(digest.hexdigest())
+            os.makedirs(os.path.dirname(body_path), exist_ok=True)
+            os.replace(tmp_path, body_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return self._store_meta(url, response, digest.hexdigest())
+
+    def _store_meta(self, url, response, digest):
+        entry = {
+            'url': url,
+            'status': response.status_code,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_type': response.headers.get('Content-Type'),
+            'encoding': response.encoding,
+            'body_sha256': digest,
+            'fetched_at': time.time()
+        }
+        self._write_atomic(self._meta_path(url), json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+        return entry
+
+    def _touch(self, url, entry):
+        """304验证通过后更新获取时间"""
+        entry = {k: v for k, v in entry.items() if k != 'content'}
+        entry['fetched_at'] = time.time()
+        self._write_atomic(self._meta_path(url), json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+
+    def conditional_headers(self, entry):
+        """根据缓存条目生成条件请求头"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def to_response(self, entry):
+        """把缓存条目转换为响应对象"""
+        headers = {}
+        if entry.get('etag'):
+            headers['ETag'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['Last-Modified'] = entry['last_modified']
+        if entry.get('content_type'):
+            headers['Content-Type'] = entry['content_type']
+        return CachedResponse(entry['url'], entry['status'], headers, entry['content'], entry.get('encoding'))
+
+    def get(self, session, url, **kwargs):
+        """通过缓存获取URL
+
+        离线模式：命中则回放，未命中抛出CacheMissError；
+        在线模式：带条件请求头访问，304时返回缓存内容，否则保存新响应。
+        """
+        if not self.enabled:
+            return session.get(url, **kwargs)
+
+        entry = self.load(url)
+        if self.offline:
+            if entry is None:
+                self._count('misses')
+                raise CacheMissError(f"离线模式下缓存未命中: {url}")
+            self._count('hits')
+            return self.to_response(entry)
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        headers.update(self.conditional_headers(entry))
+        response = session.get(url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            self._count('revalidated')
+            self._touch(url, entry)
+            return self.to_response(entry)
+
+        self._count('misses')
+        self.store(url, response)
+        return response
+
+    def get_stream(self, session, url, chunk_size=64 * 1024, **kwargs):
+        """与get()相同，但正文以二进制文件对象提供，返回(响应, 正文文件)；只有200响应有正文文件
+
+        缓存启用时正文边下载边写入缓存，再从缓存文件读取（304和离线命中直接读取缓存文件）；
+        禁用时返回已解码Content-Encoding的连接原始流。正文都不会整体载入内存，调用方负责关闭正文文件。
+        """
+        if not self.enabled:
+            response = session.get(url, stream=True, **kwargs)
+            if response.status_code != 200:
+                response.close()
+                return response, None
+            response.raw.decode_content = True
+            return response, response.raw
+
+        entry = self.load_meta(url)
+        if self.offline:
+            if entry is None:
+                self._count('misses')
+                raise CacheMissError(f"离线模式下缓存未命中: {url}")
+            self._count('hits')
+            body = self.open_body(entry) if entry['status'] == 200 else None
+            return self.to_response(dict(entry, content=b'')), body
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        headers.update(self.conditional_headers(entry))
+        response = session.get(url, headers=headers, stream=True, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            response.close()
+            self._count('revalidated')
+            self._touch(url, entry)
+            return self.to_response(dict(entry, content=b'')), self.open_body(entry)
+
+        self._count('misses')
+        if response.status_code != 200:
+            # 错误响应的正文很小，按原方式缓存
+            self.store(url, response)
+            response.close()
+            return response, None
+        try:
+            entry = self.store_stream(url, response, response.iter_content(chunk_size=chunk_size))
+        finally:
+            response.close()
+        return response, self.open_body(entry)
+
+    def summary(self):
+        """缓存使用情况摘要"""
+        if not self.enabled:
+            return "HTTP缓存: 已禁用"
+        return f"HTTP缓存: 命中 {self.hits}, 304验证 {self.revalidated}, 下载 {self.misses}"
+
+
+def add_cache_arguments(parser):
+    """为命令行脚本添加缓存相关参数"""
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'HTTP缓存目录（默认 {DEFAULT_CACHE_DIR}）')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='禁用HTTP缓存')
+    parser.add_argument('--offline', action='store_true',
+                        help='离线模式：只从缓存回放，不访问网络')
+
+
+def cache_from_args(args):
+    """根据命令行参数创建HttpCache"""
+    if args.no_cache:
+        return HttpCache(cache_dir=None)
+    return HttpCache(cache_dir=args.cache_dir, offline=args.offline)
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Setapp爬虫共享的HTTP客户端
+所有爬虫脚本统一通过这里获取页面：
+- 统一的请求头、超时和连接池大小（每个工作线程一个Session，保持长连接复用）
+- 按状态码决定是否重试：429/5xx和网络错误重试，404等确定性结果直接返回
+- 指数退避加抖动，并为每个URL设置总耗时上限
+- 内置磁盘缓存（http_cache）和自适应速率控制（rate_controller）
+- 可选的部分下载：流式读取正文，所需区域（如</main>）到达后立即断开
+- 可选的录制/回放归档（http_archive）：录制返回的每个响应，或完全不联网地从归档回放
+- 流式获取（open_stream）：正文以文件对象提供，不整体载入内存（用于大型sitemap）
+"""
+
+import io
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3Error
+
+from http_archive import HttpArchive
+from http_cache import HttpCache, CachedResponse, CacheMissError, add_cache_arguments, cache_from_args
+from rate_controller import AimdRateController, add_rate_arguments, rate_controller_from_args
+from run_metrics import RunMetrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    # requests默认不支持br解码，只声明能解压的编码
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+# (连接超时, 读取超时)，单位秒
+DEFAULT_TIMEOUT = (10, 30)
+
+# 这些状态码表示暂时性故障，值得重试；其余状态码直接返回给调用方
+RETRY_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+# 这些状态码表示页面确实不存在
+NOT_FOUND_STATUS_CODES = {404, 410}
+
+# 应用详情页需要的内容（head中的title/meta和<main>主体）到此为止
+MAIN_SECTION_END = (b'</main>',)
+
+# 部分下载时每次读取的块大小
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+class PartialResponse(CachedResponse):
+    """流式读取得到的响应，truncated表示读到结束标记后提前断开"""
+
+    from_cache = False
+
+    def __init__(self, url, status_code, headers, content, encoding, truncated):
+        super().__init__(url, status_code, headers, content, encoding)
+        self.truncated = truncated
+
+
+class _RawStream(io.RawIOBase):
+    """连接原始流的包装：把读取时的urllib3异常转换为OSError"""
+
+    def __init__(self, raw):
+        self._raw = raw
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        try:
+            data = self._raw.read(len(buffer))
+        except Urllib3Error as e:
+            raise OSError(f"读取响应正文失败: {e}") from e
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        self._raw.close()
+        super().close()
+
+
+class SetappHttpClient:
+    """带缓存、速率控制和重试策略的HTTP客户端（线程安全）"""
+
+    def __init__(self, cache=None, rate_controller=None, headers=None, pool_size=10,
+                 timeout=DEFAULT_TIMEOUT, retries=3, deadline=90.0, partial_downloads=False, metrics=None,
+                 archive=None):
+        self.headers = dict(DEFAULT_HEADERS, **(headers or {}))
+        self.cache = cache or HttpCache()
+        self.rate_controller = rate_controller or AimdRateController()
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.deadline = deadline
+        self.partial_downloads = partial_downloads
+        self.metrics = metrics or RunMetrics()
+        self.archive = archive
+        self.partial_fetches = 0
+        self.truncated_fetches = 0
+        self.bytes_read = 0
+        self._stats_lock = threading.Lock()
+        self.session = self.create_session(pool_size)
+        self._thread_local = threading.local()
+
+    def create_session(self, pool_size):
+        """创建带固定大小连接池的Session"""
+        session = requests.Session()
+        session.headers.update(self.headers)
+        # 重试由fetch()统一处理，urllib3层不再重试
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def get_session(self):
+        """获取当前线程使用的Session，工作线程各自持有独立的Session"""
+        if threading.current_thread() is threading.main_thread():
+            return self.session
+        session = getattr(self._thread_local, 'session', None)
+        if session is None:
+            session = self.create_session(pool_size=2)
+            self._thread_local.session = session
+        return session
+
+    def _timeout_within(self, remaining):
+        """单次请求的超时不超过该URL剩余的总时间"""
+        connect_timeout, read_timeout = self.timeout
+        return (min(connect_timeout, remaining), min(read_timeout, remaining))
+
+    def _count_partial(self, response):
+        with self._stats_lock:
+            self.partial_fetches += 1
+            self.truncated_fetches += response.truncated
+            self.bytes_read += len(response.content)
+
+    def _get_partial(self, session, url, stop_markers, timeout):
+        """流式获取URL，正文中出现任一结束标记（不区分大小写）后立即断开连接
+
+        只有200响应按标记截断；部分内容不写入缓存，避免其他调用方读到不完整的页面。
+        """
+        with session.get(url, stream=True, timeout=timeout) as response:
+            body = bytearray()
+            truncated = False
+            longest_marker = max(len(marker) for marker in stop_markers)
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                # 从上一块末尾回退一点开始查找，标记可能跨块
+                search_from = max(0, len(body) - longest_marker + 1)
+                body += chunk
+                if response.status_code != 200:
+                    continue
+                window = bytes(body[search_from:]).lower()
+                positions = [window.find(marker) + len(marker) for marker in stop_markers if marker in window]
+                if positions:
+                    # 截到标记末尾，使内容与块边界无关
+                    del body[search_from + min(positions):]
+                    truncated = True
+                    break
+            partial = PartialResponse(url, response.status_code, response.headers, bytes(body),
+                                      response.encoding, truncated)
+        self._count_partial(partial)
+        return partial
+
+    def fetch(self, url, stop_markers=None):
+        """按重试策略获取URL
+
+        返回最终响应（包括404等不需要重试的状态）；
+        重试耗尽、超过总耗时上限或离线模式缓存未命中时返回None。
+        stop_markers：启用部分下载时，读到这些标记即停止下载正文；
+        已缓存或离线时仍走缓存（条件请求本身就不需要下载正文）。
+        """
+        if self.archive is not None and self.archive.replaying:
+            return self._replay(url)
+
+        partial = (stop_markers and self.partial_downloads and not self.cache.offline
+                   and not self.cache.has(url))
+
+        def request(session, timeout):
+            if partial:
+                response = self._get_partial(session, url, stop_markers, timeout)
+            else:
+                response = self.cache.get(session, url, timeout=timeout)
+            return response, None, len(response.content)
+
+        response, _ = self._request_with_retries(url, request)
+        if response is not None and self.archive is not None:
+            self.archive.record(url, response)
+        return response
+
+    def _request_with_retries(self, url, request):
+        """按重试策略执行request(session, timeout) -> (响应, 正文文件, 字节数)
+
+        返回(最终响应, 正文文件)；失败时返回(None, None)。需要重试的响应的正文文件会被关闭。
+        """
+        deadline_at = time.monotonic() + self.deadline
+        for attempt in range(self.retries):
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                logger.error(f"超过总耗时上限 {self.deadline}s，放弃获取: {url}")
+                self.metrics.increment('deadline_exceeded')
+                return None, None
+            if attempt:
+                self.metrics.increment('retries')
+
+            logger.info(f"正在获取页面: {url} (尝试 {attempt + 1}/{self.retries})")
+            try:
+                if not self.cache.offline:
+                    self.rate_controller.acquire()
+                started = time.monotonic()
+                response, body, size = request(self.get_session(), self._timeout_within(remaining))
+                latency = time.monotonic() - started
+                self.rate_controller.on_response(response.status_code, latency, response.headers.get('Retry-After'))
+                self.metrics.record_request(response.status_code, latency, size,
+                                            getattr(response, 'from_cache', False))
+                if response.status_code not in RETRY_STATUS_CODES:
+                    return response, body
+                if body is not None:
+                    body.close()
+                logger.warning(f"HTTP {response.status_code}: {url}")
+            except CacheMissError as e:
+                logger.warning(str(e))
+                self.metrics.increment('offline_cache_misses')
+                return None, None
+            except requests.exceptions.RequestException as e:
+                self.rate_controller.on_error()
+                self.metrics.increment('request_errors')
+                logger.warning(f"获取页面失败: {url} - {e}")
+
+            if attempt < self.retries - 1:
+                delay = self.rate_controller.retry_delay(attempt)
+                if time.monotonic() + delay >= deadline_at:
+                    break
+                time.sleep(delay)
+
+        logger.error(f"最终获取失败: {url}")
+        self.metrics.increment('requests_failed')
+        return None, None
+
+    @contextmanager
+    def open_stream(self, url):
+        """按重试策略获取URL，以二进制文件对象提供正文；非200或获取失败时为None
+
+        正文不整体载入内存：启用缓存时边下载边写入缓存文件再从文件读取，禁用缓存时直接读取连接。
+        正文开始读取后出错不再重试，由调用方按读取错误处理（OSError）。
+        录制/回放归档需要完整正文，此时退回fetch()。
+        """
+        if self.archive is not None:
+            response = self.fetch(url)
+            ok = response is not None and response.status_code == 200
+            yield io.BytesIO(response.content) if ok else None
+            return
+
+        def request(session, timeout):
+            response, body = self.cache.get_stream(session, url, chunk_size=STREAM_CHUNK_SIZE, timeout=timeout)
+            if body is None:
+                return response, None, 0
+            if not self.cache.enabled:
+                # 连接原始流：读取出错时抛出的urllib3异常统一转换为OSError，大小未知
+                return response, io.BufferedReader(_RawStream(body), STREAM_CHUNK_SIZE), 0
+            return response, body, os.fstat(body.fileno()).st_size
+
+        response, body = self._request_with_retries(url, request)
+        if response is not None and response.status_code != 200:
+            logger.warning(f"HTTP {response.status_code}: {url}")
+        try:
+            yield body
+        finally:
+            if body is not None:
+                body.close()
+
+    def _replay(self, url):
+        """回放模式：只从归档取响应，不重试、不等待速率控制"""
+        started = time.monotonic()
+        response = self.archive.replay(url)
+        if response is None:
+            logger.warning(f"归档中没有该URL: {url}")
+            self.metrics.increment('replay_misses')
+            return None
+        self.metrics.record_request(response.status_code, time.monotonic() - started, len(response.content), True)
+        return response
+
+    def get_text(self, url):
+        """获取页面文本，只有200响应返回内容，其余情况返回None"""
+        response = self.fetch(url)
+        if response is None:
+            return None
+        if response.status_code == 200:
+            return response.text
+        if response.status_code in NOT_FOUND_STATUS_CODES:
+            logger.warning(f"页面不存在: {url}")
+        else:
+            logger.warning(f"HTTP {response.status_code}: {url}")
+        return None
+
+    def get_page(self, url, stop_markers=None):
+        """获取页面，返回(页面是否存在, 文本)
+
+        是否存在只由HTTP状态码判断：404/410返回(False, None)；
+        获取失败或其他状态返回(True, None)，由调用方决定如何降级。
+        """
+        response = self.fetch(url, stop_markers)
+        if response is None:
+            return True, None
+        if response.status_code in NOT_FOUND_STATUS_CODES:
+            logger.warning(f"页面不存在: {url}")
+            return False, None
+        if response.status_code != 200:
+            logger.warning(f"HTTP {response.status_code}: {url}")
+            return True, None
+        return True, response.text
+
+    def close(self):
+        """关闭录制中的归档文件"""
+        if self.archive is not None:
+            self.archive.close()
+
+    def summary(self):
+        """缓存、速率控制和部分下载的使用情况"""
+        summary = f"{self.cache.summary()}; {self.rate_controller.summary()}"
+        if self.archive is not None:
+            summary += f"; {self.archive.summary()}"
+        if self.partial_fetches:
+            summary += (f"; 部分下载: {self.partial_fetches} 个页面, 提前结束 {self.truncated_fetches} 个, "
+                        f"共读取 {self.bytes_read / 1024:.0f} KB")
+        return summary
+
+
+def add_client_arguments(parser):
+    """为命令行脚本添加HTTP客户端相关参数（含缓存和速率控制）"""
+    add_cache_arguments(parser)
+    add_rate_arguments(parser)
+    parser.add_argument('--pool-size', type=int, default=10,
+                        help='主线程连接池大小（默认 10）')
+    parser.add_argument('--deadline', type=float, default=90.0,
+                        help='单个URL的总耗时上限（秒，含重试，默认 90）')
+    parser.add_argument('--partial', action='store_true',
+                        help='详情页流式下载，读到</main>即停止（未缓存的页面生效，部分内容不写入缓存）')
+    archive_group = parser.add_mutually_exclusive_group()
+    archive_group.add_argument('--record', metavar='PATH', default=None,
+                               help='把本次运行的全部HTTP响应录制到归档文件（gzip JSONL）')
+    archive_group.add_argument('--replay', metavar='PATH', default=None,
+                               help='只从录制的归档回放响应，不访问网络')
+
+
+def client_from_args(args, headers=None):
+    """根据命令行参数创建SetappHttpClient，headers为脚本额外的请求头"""
+    archive = None
+    if args.record:
+        archive = HttpArchive(args.record)
+    elif args.replay:
+        archive = HttpArchive(args.replay, replay=True)
+    return SetappHttpClient(cache=cache_from_args(args), rate_controller=rate_controller_from_args(args),
+                            headers=headers, pool_size=args.pool_size, deadline=args.deadline,
+                            partial_downloads=args.partial, archive=archive)
@@ -3,83 +3,108 @@
 """
 合并CSV数据脚本
 将新爬取的数据与原有数据合并，保留原有的功能描述，更新官方网站链接
+支持任意数量的来源：按实体解析得到的规范应用ID（Setapp slug、规范化名称、模糊匹配）分组合并，
+每个字段有明确的取值优先级
 """
 
 import pandas as pd
 import sys
+import time
+import argparse
 
-def merge_csv_data():
+from app_catalog import add_catalog_arguments, write_catalog_from_args
+from entity_resolution import EntityResolver, name_key
+from run_profiler import add_profile_arguments, profile_from_args
+
+# 默认来源，按优先级从高到低：新爬取的数据在前，原有数据在后
+DEFAULT_SOURCES = ['setapp_apps_ultimate.csv', 'apps_list.csv']
+
+DEFAULT_OUTPUT = 'apps_list_merged.csv'
+
+MERGED_COLUMNS = ['名称', '平台', '评分', '官方订阅价格', '功能描述', '官方网站', 'Setapp链接']
+
+# 字段取值顺序：'newest' 按来源优先级取第一个非空值；
+# 'oldest' 反过来，优先保留低优先级来源（人工整理过的原有数据）中的非空值
+DEFAULT_PRECEDENCE = 'newest'
+FIELD_PRECEDENCE = {
+    '功能描述': 'oldest'
+}
+
+def load_source(path, rank):
+    """
+    读取一个来源CSV：所有字段按原文读为字符串，空白值视为缺失，没有名称的行被丢弃
+    """
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    df = df.reindex(columns=MERGED_COLUMNS, fill_value='')
+    df = df.apply(lambda column: column.str.strip()).replace('', pd.NA)
+    df = df[df['名称'].fillna('').map(name_key) != '']
+    df['_rank'] = rank
+    df['_row'] = range(len(df))
+    return df
+
+def resolve_keys(frame, resolver):
+    """
+    按行顺序把每条记录解析为规范应用ID（Series）；frame应已按来源优先级排好序，
+    这样同一应用的规范名称和slug来自优先级最高的来源
+    """
+    names = frame['名称'].fillna('').tolist()
+    links = frame['Setapp链接'].fillna('').tolist()
+    entities = [resolver.resolve(name, url=link) for name, link in zip(names, links)]
+    canonical = resolver.canonical_ids()
+    return pd.Series([canonical[entity] for entity in entities], index=frame.index)
+
+def merge_sources(frames, precedence=None, resolver=None):
+    """
+    按规范应用ID合并任意数量的来源（frames按优先级从高到低）
+
+    记录先按来源优先级逐条做实体解析（slug/规范化名称精确匹配，其余用分桶的模糊匹配），
+    再按ID分组（哈希分组），每个字段按取值规则向量化地选出第一个非空值；
+    同一来源内重复的应用只保留第一行。输出顺序为应用首次出现的位置：先按来源优先级，再按来源内的行号。
+    """
+    precedence = dict(FIELD_PRECEDENCE, **(precedence or {}))
+    if resolver is None:
+        resolver = EntityResolver()
+    combined = pd.concat(frames, ignore_index=True).sort_values(['_rank', '_row'], kind='stable')
+    combined['_key'] = resolve_keys(combined, resolver)
+    newest_first = combined.drop_duplicates(['_rank', '_key'])
+    oldest_first = newest_first.sort_values(['_rank', '_row'], ascending=[False, True], kind='stable')
+    
+    # 每个键第一次出现的位置决定输出顺序
+    order = newest_first.drop_duplicates('_key')['_key']
+    
+    merged = pd.DataFrame(index=pd.Index(order, name='_key'))
+    newest = newest_first.groupby('_key', sort=False)
+    oldest = oldest_first.groupby('_key', sort=False)
+    for column in MERGED_COLUMNS:
+        groups = oldest if precedence.get(column, DEFAULT_PRECEDENCE) == 'oldest' else newest
+        # GroupBy.first() 跳过缺失值，即每组中按取值顺序的第一个非空值
+        merged[column] = groups[column].first()
+    
+    return merged.reset_index(drop=True).fillna('')
+
+def merge_csv_data(sources=None, output_file=DEFAULT_OUTPUT, args=None):
     """
-    合并两个CSV文件的数据
+    合并多个CSV文件的数据（sources按优先级从高到低）
     """
+    sources = sources or DEFAULT_SOURCES
     try:
-        # 读取原始数据
-        print("正在读取原始数据...")
-        original_df = pd.read_csv('apps_list.csv')
-        print(f"原始数据包含 {len(original_df)} 个应用")
+        frames = []
+        for rank, path in enumerate(sources):
+            print(f"正在读取 {path}...")
+            frames.append(load_source(path, rank))
+            print(f"{path} 包含 {len(frames[-1])} 个应用")
         
-        # 读取新爬取的数据
-        print("正在读取新爬取的数据...")
-        new_df = pd.read_csv('setapp_apps_ultimate.csv')
-        print(f"新数据包含 {len(new_df)} 个应用")
-        
-        # 创建合并后的数据框
-        merged_data = []
-        
-        # 处理新数据中的每个应用
-        for _, new_row in new_df.iterrows():
-            app_name = new_row['名称']
-            
-            # 在原始数据中查找对应的应用
-            original_match = original_df[original_df['名称'] == app_name]
-            
-            if not original_match.empty:
-                # 如果在原始数据中找到了，使用原始数据的功能描述
-                original_row = original_match.iloc[0]
-                merged_row = {
-                    '名称': app_name,
-                    '平台': new_row['平台'],  # 使用新数据的平台信息
-                    '评分': new_row['评分'],
-                    '官方订阅价格': new_row['官方订阅价格'],
-                    '功能描述': original_row['功能描述'] if pd.notna(original_row['功能描述']) and original_row['功能描述'].strip() else new_row['功能描述'],
-                    '官方网站': new_row['官方网站'],  # 使用新数据的官方网站
-                    'Setapp链接': new_row['Setapp链接']
-                }
-            else:
-                # 如果在原始数据中没找到，直接使用新数据
-                merged_row = {
-                    '名称': app_name,
-                    '平台': new_row['平台'],
-                    '评分': new_row['评分'],
-                    '官方订阅价格': new_row['官方订阅价格'],
-                    '功能描述': new_row['功能描述'],
-                    '官方网站': new_row['官方网站'],
-                    'Setapp链接': new_row['Setapp链接']
-                }
-            
-            merged_data.append(merged_row)
-        
-        # 添加原始数据中存在但新数据中不存在的应用
-        new_app_names = set(new_df['名称'].tolist())
-        for _, original_row in original_df.iterrows():
-            if original_row['名称'] not in new_app_names:
-                merged_row = {
-                    '名称': original_row['名称'],
-                    '平台': original_row['平台'],
-                    '评分': original_row['评分'],
-                    '官方订阅价格': original_row['官方订阅价格'],
-                    '功能描述': original_row['功能描述'],
-                    '官方网站': original_row['官方网站'],
-                    'Setapp链接': original_row['Setapp链接']
-                }
-                merged_data.append(merged_row)
-        
-        # 创建合并后的DataFrame
-        merged_df = pd.DataFrame(merged_data)
+        started = time.perf_counter()
+        resolver = EntityResolver()
+        merged_df = merge_sources(frames, resolver=resolver)
+        print(f"合并用时 {(time.perf_counter() - started) * 1000:.1f} ms")
+        print(resolver.summary())
         
         # 保存合并后的数据
-        merged_df.to_csv('apps_list_merged.csv', index=False, encoding='utf-8')
+        merged_df.to_csv(output_file, index=False, encoding='utf-8')
         print(f"\n合并完成！共包含 {len(merged_df)} 个应用")
+        if args is not None:
+            write_catalog_from_args(args, merged_df, output_file)
         
         # 统计信息
         print("\n=== 合并统计 ===")
@@ -106,5 +131,15 @@ def merge_csv_data():
         return False
 
 if __name__ == "__main__":
-    success = merge_csv_data()
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="合并CSV数据")
+    parser.add_argument('sources', nargs='*',
+                        help=f'要合并的CSV文件，按优先级从高到低（默认 {" ".join(DEFAULT_SOURCES)}）')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT,
+                        help=f'输出CSV文件（默认 {DEFAULT_OUTPUT}）')
+    add_catalog_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    with profile_from_args(args):
+        success = merge_csv_data(args.sources, args.output, args)
+    sys.exit(0 if success else 1)
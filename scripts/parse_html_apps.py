@@ -4,12 +4,48 @@
 解析本地HTML文件，提取Setapp应用数据
 """
 
-import re
+import os
 import csv
+import argparse
 import json
 from bs4 import BeautifulSoup
 from urllib.parse import unquote
 
+from app_details_scanner import iter_tag_groups, parse_tag_attributes
+from html_batch import parse_html_batch, add_batch_arguments
+from run_profiler import add_profile_arguments, profile_from_args
+
+def parse_app_attributes(attributes):
+    """
+    解析一个app-details标签的属性部分，没有name属性时返回None
+    """
+    # 一次扫描解析全部属性（顺序任意，引号可有可无，HTML实体已解码）
+    attrs = parse_tag_attributes(attributes)
+    
+    if not attrs.get('name'):
+        return None
+    return {
+        '名称': attrs.get('name', ''),
+        '平台': attrs.get('platforms', 'Mac'),
+        '官方网站': attrs.get('url', ''),
+        '功能描述': attrs.get('description', ''),
+        '评分': attrs.get('rating', '0')
+    }
+
+def iter_html_apps(html_file_path):
+    """
+    逐个产出HTML文件中的应用数据（生成器）
+    文件通过mmap流式扫描，内存占用与文件大小无关，找到第一个应用即可产出
+    """
+    for i, (attributes,) in enumerate(iter_tag_groups(html_file_path)):
+        try:
+            app_data = parse_app_attributes(attributes)
+        except Exception as e:
+            print(f"解析应用 {i+1} 时出错: {e}")
+            continue
+        if app_data:
+            yield app_data
+
 def parse_html_file(html_file_path):
     """
     解析HTML文件，提取应用数据
@@ -17,65 +53,16 @@ def parse_html_file(html_file_path):
     print(f"正在解析HTML文件: {html_file_path}")
     
     try:
-        with open(html_file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        print(f"HTML文件大小: {len(content)} 字符")
-        
-        # 使用正则表达式查找所有app-details标签
-        app_pattern = r'<app-details\s+([^>]+)>'
-        matches = re.findall(app_pattern, content)
-        
-        print(f"找到 {len(matches)} 个应用")
+        print(f"HTML文件大小: {os.path.getsize(html_file_path)} 字节")
         
         apps = []
+        for app_data in iter_html_apps(html_file_path):
+            apps.append(app_data)
+            
+            if len(apps) <= 5:  # 显示前5个应用的信息
+                print(f"应用 {len(apps)}: {app_data['名称']} - {app_data['功能描述'][:50]}...")
         
-        for i, match in enumerate(matches):
-            try:
-                # 解析属性
-                attrs = {}
-                
-                # 提取name属性
-                name_match = re.search(r'name="([^"]+)"', match)
-                if name_match:
-                    attrs['name'] = name_match.group(1)
-                
-                # 提取description属性
-                desc_match = re.search(r'description="([^"]+)"', match)
-                if desc_match:
-                    attrs['description'] = desc_match.group(1)
-                
-                # 提取url属性
-                url_match = re.search(r'url=([^\s>]+)', match)
-                if url_match:
-                    attrs['url'] = url_match.group(1)
-                
-                # 提取platforms属性
-                platforms_match = re.search(r'platforms=([^\s>]+)', match)
-                if platforms_match:
-                    attrs['platforms'] = platforms_match.group(1)
-                
-                # 提取rating属性
-                rating_match = re.search(r'rating=([^\s>]+)', match)
-                if rating_match:
-                    attrs['rating'] = rating_match.group(1)
-                
-                if 'name' in attrs:
-                    app_data = {
-                        '名称': attrs.get('name', ''),
-                        '平台': attrs.get('platforms', 'Mac'),
-                        '官方网站': attrs.get('url', ''),
-                        '功能描述': attrs.get('description', ''),
-                        '评分': attrs.get('rating', '0')
-                    }
-                    apps.append(app_data)
-                    
-                    if i < 5:  # 显示前5个应用的信息
-                        print(f"应用 {i+1}: {app_data['名称']} - {app_data['功能描述'][:50]}...")
-                        
-            except Exception as e:
-                print(f"解析应用 {i+1} 时出错: {e}")
-                continue
+        print(f"找到 {len(apps)} 个应用")
         
         return apps
         
@@ -134,12 +121,15 @@ def analyze_data(apps):
     for platform, count in sorted(platform_count.items()):
         print(f"  {platform}: {count}")
 
-def main():
-    html_file = "/Volumes/003/002/setapp-apps-showcase/Apps for your tasks ｜ Setapp (2025_8_29 15：38：10).html"
-    output_file = "apps_list_from_html.csv"
-    
-    # 解析HTML文件
-    apps = parse_html_file(html_file)
+def main(inputs=None, output_file="apps_list_from_html.csv", workers=None):
+    if inputs:
+        # 批量模式：多个快照并行解析，去重合并后统一分析
+        apps = parse_html_batch(inputs, iter_html_apps, workers)
+    else:
+        html_file = "/Volumes/003/002/setapp-apps-showcase/Apps for your tasks ｜ Setapp (2025_8_29 15：38：10).html"
+        
+        # 解析HTML文件
+        apps = parse_html_file(html_file)
     
     if apps:
         # 分析数据
@@ -153,4 +143,12 @@ def main():
         print("未能提取到任何应用数据")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="解析本地HTML文件，提取Setapp应用数据")
+    add_batch_arguments(parser)
+    parser.add_argument('--output', default="apps_list_from_html.csv",
+                        help='输出CSV文件（默认 apps_list_from_html.csv）')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    with profile_from_args(args):
+        main(args.inputs, args.output, args.workers)
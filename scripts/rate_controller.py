@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Setapp爬虫共享的自适应请求速率控制（AIMD）
+- 响应正常且延迟在目标以内时，请求速率线性增加（加性增）
+- 遇到429/503、其他5xx或网络错误时，请求速率减半（乘性减）
+- 服务器返回Retry-After时，在指定时间之前暂停所有请求
+所有线程共用同一个控制器，限制的是整个爬虫的总请求速率。
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# 表示服务器要求降速的状态码
+BACKOFF_STATUS_CODES = {429, 503}
+
+
+def parse_retry_after(value):
+    """解析Retry-After头（秒数或HTTP日期），返回需要等待的秒数"""
+    if not value:
+        return None
+    value = str(value).strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class AimdRateController:
+    """加性增、乘性减的请求速率控制器（线程安全）
+
+    rate的单位是每秒请求数。
+    """
+
+    def __init__(self, initial_rate=1.0, min_rate=0.1, max_rate=10.0,
+                 increase_step=0.1, decrease_factor=0.5, latency_target=3.0,
+                 max_retry_after=120.0):
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_target = latency_target
+        self.max_retry_after = max_retry_after
+        self.backoffs = 0
+        self._next_slot = 0.0
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """等待到下一个可用的请求时间点"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot, self._blocked_until)
+            self._next_slot = slot + 1.0 / self.rate
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def _decrease(self):
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        self.backoffs += 1
+
+    def on_response(self, status_code, latency, retry_after=None):
+        """根据一次响应的状态码和延迟调整速率"""
+        with self._lock:
+            if status_code in BACKOFF_STATUS_CODES or status_code >= 500:
+                self._decrease()
+                delay = parse_retry_after(retry_after)
+                if delay:
+                    delay = min(delay, self.max_retry_after)
+                    self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+            elif latency <= self.latency_target:
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+            # 延迟超过目标但状态正常时保持当前速率
+
+    def on_error(self):
+        """网络错误（超时、连接失败等）视为拥塞信号"""
+        with self._lock:
+            self._decrease()
+
+    def retry_delay(self, attempt, base=1.0, cap=30.0):
+        """第attempt次重试前的等待时间：指数退避加全抖动"""
+        return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+    def summary(self):
+        return f"请求速率: 当前 {self.rate:.2f} 次/秒, 退避 {self.backoffs} 次"
+
+
+def add_rate_arguments(parser):
+    """为命令行脚本添加速率控制参数"""
+    parser.add_argument('--initial-rate', type=float, default=1.0,
+                        help='初始请求速率（次/秒，默认 1.0）')
+    parser.add_argument('--max-rate', type=float, default=10.0,
+                        help='最大请求速率（次/秒，默认 10.0）')
+
+
+def rate_controller_from_args(args):
+    """根据命令行参数创建AimdRateController"""
+    return AimdRateController(initial_rate=args.initial_rate, max_rate=args.max_rate)
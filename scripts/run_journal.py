@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬虫运行日志（journal）
+每完成一个应用就追加一行JSON（slug + CSV行）并立即落盘；
+中断后使用--resume重新运行时，已完成的应用直接从日志恢复，不再重复获取。
+标记为retry的记录（如网络失败时生成的备用数据）只用于本次输出，恢复时会重新获取。
+"""
+
+import json
+import os
+import threading
+
+
+class RunJournal:
+    """追加写入的应用完成记录（线程安全）"""
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.resume = resume
+        self.completed = {}
+        # 有记录但需要在恢复时重新获取的应用
+        self.retry = set()
+        self._file = None
+        self._lock = threading.Lock()
+        if resume:
+            self.load()
+
+    def load(self):
+        """读取已有日志；最后一行可能因中断而不完整，解析失败的行直接跳过"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    self._remember(entry['slug'], entry.get('row'), entry.get('retry', False))
+                except (ValueError, KeyError, TypeError):
+                    continue
+
+    def _remember(self, slug, row, retry):
+        self.completed[slug] = row
+        if retry:
+            self.retry.add(slug)
+        else:
+            self.retry.discard(slug)
+
+    def is_done(self, slug):
+        return slug in self.completed and slug not in self.retry
+
+    def record(self, slug, row, retry=False):
+        """记录一个已完成的应用（row为None表示处理失败；retry为True时恢复运行会重新获取）"""
+        entry = {'slug': slug, 'row': row}
+        if retry:
+            entry['retry'] = True
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            if self._file is None:
+                # 非恢复模式下首次写入时清空旧日志
+                self._file = open(self.path, 'a' if self.resume else 'w', encoding='utf-8')
+                if self.resume and self._file.tell() > 0:
+                    # 上次中断时最后一行可能没有换行符，先补齐，避免与新记录粘连
+                    self._file.write('\n')
+            self._file.write(line + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._remember(slug, row, retry)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
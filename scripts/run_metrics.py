@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬虫运行指标
+每次运行结束时写出一个JSON文件，便于查看时间花在哪里、跨运行对比性能回退：
+- 每个请求的延迟直方图、传输字节数、状态码分布
+- 重试次数、缓存命中率、备用数据（generate_fallback_data）次数等计数
+- 各阶段（discover/fetch/parse/extract/write）的墙钟时间和CPU时间
+阶段CPU时间用time.thread_time()按线程统计，线程池中并行执行的阶段也能正确累加。
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# 延迟直方图的桶上界（秒）
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRICS_VERSION = 1
+
+# 各线程当前所在的阶段（线程ID -> 阶段名栈），供run_profiler按阶段归类采样
+active_stages = {}
+
+
+class LatencyHistogram:
+    """固定桶的延迟直方图"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, seconds):
+        index = next((i for i, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def to_dict(self):
+        labels = [f"le_{bound:g}" for bound in self.buckets] + ['+Inf']
+        return {
+            'count': self.count,
+            'sum_seconds': round(self.total, 6),
+            'mean_seconds': round(self.total / self.count, 6) if self.count else None,
+            'min_seconds': round(self.min, 6) if self.min is not None else None,
+            'max_seconds': round(self.max, 6) if self.max is not None else None,
+            'buckets': dict(zip(labels, self.counts))
+        }
+
+
+class RunMetrics:
+    """一次运行的指标收集器（线程安全）"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._started = time.monotonic()
+        self._cpu_started = time.process_time()
+        self.latency = LatencyHistogram()
+        self.status_codes = {}
+        self.bytes_transferred = 0
+        self.counters = {}
+        self.stages = {}
+        self.info = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_request(self, status_code, latency, size, from_cache):
+        """记录一次HTTP请求；从缓存回放（含304验证）的响应不计入传输字节"""
+        with self._lock:
+            self.latency.observe(latency)
+            key = str(status_code)
+            self.status_codes[key] = self.status_codes.get(key, 0) + 1
+            self.counters['requests'] = self.counters.get('requests', 0) + 1
+            if from_cache:
+                self.counters['requests_from_cache'] = self.counters.get('requests_from_cache', 0) + 1
+            else:
+                self.bytes_transferred += size
+
+    @contextmanager
+    def stage(self, name):
+        """统计一个阶段的调用次数、墙钟时间和当前线程的CPU时间"""
+        wall_started = time.perf_counter()
+        cpu_started = time.thread_time()
+        stages = active_stages.setdefault(threading.get_ident(), [])
+        stages.append(name)
+        try:
+            yield
+        finally:
+            stages.pop()
+            wall = time.perf_counter() - wall_started
+            cpu = time.thread_time() - cpu_started
+            with self._lock:
+                stage = self.stages.setdefault(name, {'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0})
+                stage['calls'] += 1
+                stage['wall_seconds'] += wall
+                stage['cpu_seconds'] += cpu
+
+    def set_info(self, **info):
+        """记录运行信息（模式、应用数量等）"""
+        with self._lock:
+            self.info.update(info)
+
+    def to_dict(self, cache=None):
+        with self._lock:
+            counters = dict(self.counters)
+            report = {
+                'version': METRICS_VERSION,
+                'started_at': self.started_at,
+                'wall_seconds': round(time.monotonic() - self._started, 6),
+                'cpu_seconds': round(time.process_time() - self._cpu_started, 6),
+                'run': dict(self.info),
+                'requests': {
+                    'latency': self.latency.to_dict(),
+                    'status_codes': dict(self.status_codes),
+                    'bytes_transferred': self.bytes_transferred
+                },
+                'counters': counters,
+                'stages': {name: {key: round(value, 6) if isinstance(value, float) else value
+                                  for key, value in stage.items()}
+                           for name, stage in self.stages.items()}
+            }
+        if cache is not None and cache.enabled:
+            lookups = cache.hits + cache.revalidated + cache.misses
+            report['cache'] = {
+                'hits': cache.hits,
+                'revalidated': cache.revalidated,
+                'misses': cache.misses,
+                'hit_rate': round((cache.hits + cache.revalidated) / lookups, 4) if lookups else None
+            }
+        return report
+
+    def write(self, path, cache=None):
+        """原子地写出指标文件"""
+        data = json.dumps(self.to_dict(cache), ensure_ascii=False, indent=2)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运行剖析（--profile）
+用后台线程定时采样所有线程的调用栈（sys._current_frames），开销与被测代码的函数调用次数无关，
+线程池和异步模式下的工作线程也能采到。运行结束后写出：
+- PREFIX.collapsed：折叠栈格式（"阶段;模块:函数;... 样本数"），
+  可直接交给flamegraph.pl、speedscope或inferno生成火焰图
+- PREFIX.top.txt：各阶段的样本占比，以及全局和每个阶段的热点函数（按自身样本和累计样本）
+
+样本按流水线阶段归类：线程处于RunMetrics.stage()中时使用该阶段名；
+否则从栈顶向下按模块和函数名推断（html_backend/bs4 -> parse、requests -> fetch等）。
+只在线程池/队列/事件循环中等待的空闲线程不计入样本。
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from run_metrics import active_stages
+
+DEFAULT_INTERVAL_MS = 5.0
+DEFAULT_TOP = 25
+
+# 模块（或第三方包）-> 阶段
+STAGE_BY_MODULE = {
+    'html_backend': 'parse', 'bs4': 'parse', 'lxml': 'parse', 'selectolax': 'parse', 'html5lib': 'parse',
+    'extraction_engine': 'extract', 'platform_matcher': 'extract',
+    'sitemap_crawler': 'discover', 'app_registry': 'discover',
+    'http_client': 'fetch', 'http_cache': 'fetch', 'http_archive': 'fetch', 'rate_controller': 'fetch',
+    'requests': 'fetch', 'urllib3': 'fetch', 'ssl': 'fetch', 'socket': 'fetch', 'aiohttp': 'fetch',
+    'run_journal': 'write', 'scrape_state': 'write', 'csv': 'write'
+}
+
+# 函数名前缀 -> 阶段，模块无法判断时使用
+STAGE_BY_FUNCTION_PREFIX = (
+    ('parse', 'parse'), ('extract', 'extract'), ('translate', 'extract'), ('clean', 'extract'),
+    ('discover', 'discover'), ('fetch', 'fetch'), ('get_app_page', 'fetch'),
+    ('save', 'write'), ('write', 'write'), ('merge', 'merge'), ('analyze', 'analyze')
+)
+
+# 栈顶位于这些标准库模块（或线程池的取任务循环）时，线程只是在等待任务或I/O事件
+IDLE_MODULES = {'threading', 'queue', 'selectors'}
+IDLE_FUNCTIONS = {('thread', '_worker')}
+
+OTHER_STAGE = 'other'
+
+
+def _module_name(filename):
+    """文件路径 -> 模块名；第三方包取包名（site-packages下的第一级目录）"""
+    if filename.startswith('<frozen '):
+        return filename[len('<frozen '):-1]
+    parts = filename.replace('\\', '/').split('/')
+    if 'site-packages' in parts:
+        index = parts.index('site-packages')
+        if index + 1 < len(parts):
+            return parts[index + 1].split('.')[0]
+    return os.path.splitext(parts[-1])[0]
+
+
+class SamplingProfiler:
+    """定时采样所有线程调用栈的剖析器"""
+
+    def __init__(self, interval=DEFAULT_INTERVAL_MS / 1000):
+        self.interval = interval
+        self.samples = 0
+        self.stacks = Counter()
+        self.started_at = None
+        self.elapsed = 0.0
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self.started_at
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(own_id)
+
+    def _label(self, code):
+        """代码对象 -> "模块:函数"，结果按代码对象缓存"""
+        label = self._labels.get(code)
+        if label is None:
+            module = _module_name(code.co_filename)
+            label = (module, getattr(code, 'co_qualname', code.co_name))
+            self._labels[code] = label
+        return label
+
+    def sample(self, own_id=None):
+        """记录所有线程（除剖析器自身）当前的调用栈"""
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            codes = []
+            while frame is not None:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            if not codes:
+                continue
+            leaf = self._label(codes[0])
+            if leaf[0] in IDLE_MODULES or leaf in IDLE_FUNCTIONS:
+                continue
+            stages = active_stages.get(thread_id)
+            try:
+                stage = stages[-1] if stages else None
+            except IndexError:
+                stage = None
+            codes.reverse()
+            self.stacks[(stage, tuple(codes))] += 1
+            self.samples += 1
+
+    def classify(self, codes):
+        """推断未处于RunMetrics阶段中的栈属于哪个阶段：从栈顶向下找第一个可识别的帧"""
+        for code in reversed(codes):
+            module, function = self._label(code)
+            stage = STAGE_BY_MODULE.get(module)
+            if stage:
+                return stage
+            name = function.rsplit('.', 1)[-1].lstrip('_')
+            for prefix, stage in STAGE_BY_FUNCTION_PREFIX:
+                if name.startswith(prefix):
+                    return stage
+        return OTHER_STAGE
+
+    def stage_stacks(self):
+        """[(阶段, [标签...], 样本数)]"""
+        return [(stage or self.classify(codes), [':'.join(self._label(code)) for code in codes], count)
+                for (stage, codes), count in self.stacks.items()]
+
+    def collapsed(self):
+        """折叠栈文本，每行"阶段;帧;帧... 样本数\""""
+        merged = Counter()
+        for stage, labels, count in self.stage_stacks():
+            merged[';'.join([stage] + labels)] += count
+        return ''.join(f"{stack} {count}\n" for stack, count in sorted(merged.items()))
+
+    def report(self, top=DEFAULT_TOP):
+        """阶段占比和热点函数的文本报告"""
+        stage_counts = Counter()
+        self_counts = Counter()
+        total_counts = Counter()
+        for stage, labels, count in self.stage_stacks():
+            stage_counts[stage] += count
+            self_counts[(stage, labels[-1])] += count
+            # 递归调用的函数在一个栈中只计一次
+            for label in set(labels):
+                total_counts[(stage, label)] += count
+
+        total = self.samples or 1
+        lines = [f"采样: {self.samples} 个样本, 间隔 {self.interval * 1000:g} ms, 运行 {self.elapsed:.1f}s", "",
+                 "阶段分布:"]
+        for stage, count in stage_counts.most_common():
+            lines.append(f"  {stage:<10} {count:>8} {count / total:>7.1%}")
+
+        def hot_functions(title, keys, limit):
+            lines.extend(["", title, f"  {'自身':>7} {'累计':>7}  {'阶段':<10} 函数"])
+            for key in keys[:limit]:
+                lines.append(f"  {self_counts[key] / total:>7.1%} {total_counts[key] / total:>7.1%}  "
+                             f"{key[0]:<10} {key[1]}")
+
+        hot_functions(f"热点函数（按自身样本，前 {top} 个）:",
+                      [key for key, _ in self_counts.most_common()], top)
+        for stage, _ in stage_counts.most_common():
+            keys = [key for key, _ in self_counts.most_common() if key[0] == stage]
+            hot_functions(f"[{stage}] 热点函数:", keys, min(top, 10))
+        return '\n'.join(lines) + '\n'
+
+    def write(self, prefix, top=DEFAULT_TOP):
+        """写出折叠栈和热点报告，返回报告文本"""
+        report = self.report(top)
+        with open(f"{prefix}.collapsed", 'w', encoding='utf-8') as f:
+            f.write(self.collapsed())
+        with open(f"{prefix}.top.txt", 'w', encoding='utf-8') as f:
+            f.write(report)
+        return report
+
+
+def add_profile_arguments(parser):
+    """为命令行脚本添加剖析相关参数"""
+    parser.add_argument('--profile', metavar='PREFIX', default=None,
+                        help='采样剖析本次运行，写出PREFIX.collapsed（火焰图）和PREFIX.top.txt（热点函数）')
+    parser.add_argument('--profile-interval', type=float, default=DEFAULT_INTERVAL_MS,
+                        help=f'采样间隔（毫秒，默认 {DEFAULT_INTERVAL_MS:g}）')
+    parser.add_argument('--profile-top', type=int, default=DEFAULT_TOP,
+                        help=f'报告中列出的热点函数数量（默认 {DEFAULT_TOP}）')
+
+
+@contextmanager
+def profile_from_args(args):
+    """未指定--profile时什么也不做；否则剖析with块内的运行并在结束时写出结果"""
+    if not args.profile:
+        yield None
+        return
+    profiler = SamplingProfiler(interval=args.profile_interval / 1000)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        report = profiler.write(args.profile, top=args.profile_top)
+        print(f"\n=== 性能剖析 ===\n{report}")
+        print(f"火焰图输入: {args.profile}.collapsed, 热点报告: {args.profile}.top.txt")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量爬取状态文件
+按应用slug记录页面关键区域的内容哈希、sitemap的lastmod和上次提取的结果：
+- sitemap的lastmod与上次一致时直接复用上次的结果，连页面都不需要下载
+- 页面关键区域没有变化时直接复用上次的结果，跳过HTML解析和信息提取
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+DEFAULT_STATE_FILE = '.scrape_state.json'
+
+# 状态文件格式版本，提取逻辑发生不兼容变化时递增，使旧状态全部失效
+# 2：整页文本在元素边界处分隔，平台识别结果变化
+STATE_VERSION = 2
+
+
+def page_region_digest(content):
+    """计算页面关键区域（title、meta描述和main主体）的哈希
+
+    只做字符串查找，不解析HTML；找不到main时退回整页内容。
+    """
+    lowered = content.lower()
+    parts = []
+
+    start = lowered.find('<title')
+    if start != -1:
+        end = lowered.find('</title>', start)
+        parts.append(content[start:end if end != -1 else start + 512])
+
+    for marker in ('name="description"', 'property="og:description"'):
+        pos = lowered.find(marker)
+        if pos != -1:
+            tag_start = lowered.rfind('<meta', 0, pos)
+            tag_end = lowered.find('>', pos)
+            if tag_start != -1 and tag_end != -1:
+                parts.append(content[tag_start:tag_end + 1])
+
+    start = lowered.find('<main')
+    if start != -1:
+        end = lowered.rfind('</main>')
+        parts.append(content[start:end + len('</main>')] if end > start else content[start:])
+    else:
+        parts.append(content)
+
+    return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+class ScrapeState:
+    """以slug为键的增量爬取状态（线程安全）"""
+
+    def __init__(self, path=DEFAULT_STATE_FILE, fresh=False):
+        """fresh为True时忽略已有状态（全量重新提取），但仍会写入新状态"""
+        self.path = path
+        self.apps = {}
+        self.reused = 0
+        self.not_modified = 0
+        self.updated = 0
+        self._lock = threading.Lock()
+        if not fresh:
+            self.load()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == STATE_VERSION:
+            self.apps = data.get('apps', {})
+
+    def lookup(self, slug, digest):
+        """页面哈希与上次一致时返回(True, 上次的记录)，否则返回(False, None)"""
+        with self._lock:
+            entry = self.apps.get(slug)
+            if entry and entry.get('digest') == digest:
+                self.reused += 1
+                return True, entry.get('record')
+        return False, None
+
+    def lookup_lastmod(self, slug, lastmod):
+        """sitemap的lastmod与上次记录一致时返回(True, 上次的记录)，否则返回(False, None)"""
+        if not lastmod:
+            return False, None
+        with self._lock:
+            entry = self.apps.get(slug)
+            if entry and entry.get('lastmod') == lastmod:
+                self.not_modified += 1
+                return True, entry.get('record')
+        return False, None
+
+    def remember_lastmod(self, slug, lastmod):
+        """页面内容未变化但lastmod更新时，只记录新的lastmod"""
+        if not lastmod:
+            return
+        with self._lock:
+            entry = self.apps.get(slug)
+            if entry:
+                entry['lastmod'] = lastmod
+
+    def update(self, slug, digest, record, lastmod=None):
+        """保存本次提取结果（record为None表示页面不存在）"""
+        with self._lock:
+            self.apps[slug] = {'digest': digest, 'record': record}
+            if lastmod:
+                self.apps[slug]['lastmod'] = lastmod
+            self.updated += 1
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps({'version': STATE_VERSION, 'apps': self.apps}, ensure_ascii=False, indent=1)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    def summary(self):
+        return f"增量状态: lastmod未变跳过 {self.not_modified}, 复用 {self.reused}, 重新提取 {self.updated}"
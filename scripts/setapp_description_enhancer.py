@@ -5,52 +5,41 @@ Setapp应用描述增强器
 专门用于获取应用的详细功能描述
 """
 
-import requests
 import pandas as pd
-from bs4 import BeautifulSoup
-import time
-import random
 from urllib.parse import urljoin, urlparse
 import re
 import sys
+import argparse
+
+from http_client import SetappHttpClient, add_client_arguments, client_from_args
+from app_catalog import add_catalog_arguments, write_catalog
+from document_memo import DocumentMemo
+from html_backend import add_parser_arguments, configure_from_args, page_text
+from run_profiler import add_profile_arguments, profile_from_args
+from platform_matcher import PlatformMatcher
+
+# 增强器只识别这三个平台
+PLATFORM_MATCHER = PlatformMatcher([
+    {'text': ['mac', 'macos'], 'platform': 'Mac'},
+    {'text': ['ios', 'iphone'], 'platform': 'iOS'},
+    {'text': ['ipad', 'ipados'], 'platform': 'iPadOS'}
+])
 
 class SetappDescriptionEnhancer:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        })
+    def __init__(self, client=None):
+        self.client = client or SetappHttpClient()
+        # 同一页面只下载、解析一次，描述和平台提取共用同一棵解析树
+        self.documents = DocumentMemo(self.get_page_content)
         
-    def get_page_content(self, url, max_retries=3):
-        """获取页面内容"""
-        for attempt in range(max_retries):
-            try:
-                response = self.session.get(url, timeout=15)
-                if response.status_code == 200:
-                    return response.text
-                elif response.status_code == 404:
-                    print(f"页面不存在: {url}")
-                    return None
-                else:
-                    print(f"HTTP {response.status_code}: {url}")
-            except Exception as e:
-                print(f"请求失败 (尝试 {attempt + 1}/{max_retries}): {url} - {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(random.uniform(2, 5))
-        return None
+    def get_page_content(self, url):
+        """获取页面内容（请求、缓存与重试由共享HTTP客户端处理）"""
+        return self.client.get_text(url)
     
     def extract_app_description(self, setapp_url):
         """从Setapp应用页面提取详细描述"""
-        html = self.get_page_content(setapp_url)
-        if not html:
+        soup = self.documents.get(setapp_url)
+        if soup is None:
             return None
-            
-        soup = BeautifulSoup(html, 'html.parser')
         
         # 尝试多种选择器来获取应用描述
         description_selectors = [
@@ -104,11 +93,10 @@ class SetappDescriptionEnhancer:
     
     def extract_platform_info(self, setapp_url):
         """从Setapp应用页面提取平台信息"""
-        html = self.get_page_content(setapp_url)
-        if not html:
+        soup = self.documents.get(setapp_url)
+        if soup is None:
             return "Mac"
-            
-        soup = BeautifulSoup(html, 'html.parser')
+        
         platforms = set()
         
         # 查找平台信息的选择器
@@ -121,31 +109,19 @@ class SetappDescriptionEnhancer:
         ]
         
         for selector in platform_selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                text = element.get_text().lower()
-                if 'mac' in text or 'macos' in text:
-                    platforms.add('Mac')
-                if 'ios' in text or 'iphone' in text:
-                    platforms.add('iOS')
-                if 'ipad' in text or 'ipados' in text:
-                    platforms.add('iPadOS')
+            for element in soup.select(selector):
+                platforms |= PLATFORM_MATCHER.find(page_text(element))
         
         # 如果没有找到明确的平台信息，检查页面内容
+        # （元素之间以空格分隔，否则相邻元素的文本会粘连成"macOSiOS"；脚本和样式不算页面内容）
         if not platforms:
-            page_text = soup.get_text().lower()
-            if 'mac' in page_text or 'macos' in page_text:
-                platforms.add('Mac')
-            if 'ios' in page_text or 'iphone' in page_text:
-                platforms.add('iOS')
-            if 'ipad' in page_text or 'ipados' in page_text:
-                platforms.add('iPadOS')
+            platforms = PLATFORM_MATCHER.find(page_text(soup))
         
         # 默认返回Mac
         return ', '.join(sorted(platforms)) if platforms else 'Mac'
     
-    def enhance_descriptions(self, csv_file='apps_list.csv'):
-        """增强应用描述"""
+    def enhance_descriptions(self, csv_file='apps_list.csv', catalog_file=None):
+        """增强应用描述；指定catalog_file时同时写出带类型的压缩目录"""
         try:
             # 读取CSV文件
             df = pd.read_csv(csv_file)
@@ -186,17 +162,22 @@ class SetappDescriptionEnhancer:
                     else:
                         print(f"  平台信息无变化: Mac")
                 
-                # 添加延迟避免被封
-                time.sleep(random.uniform(1, 3))
+                # 该应用的所有提取都已完成，释放解析树
+                self.documents.evict(setapp_url)
             
             # 保存增强后的数据
             output_file = 'apps_list_enhanced.csv'
             df.to_csv(output_file, index=False, encoding='utf-8')
+            if catalog_file:
+                write_catalog(df, catalog_file, output_file)
             
             print(f"\n=== 增强完成 ===")
             print(f"总应用数: {len(df)}")
             print(f"新增功能描述: {enhanced_count} 个")
             print(f"更新平台信息: {platform_updated_count} 个")
+            print(self.client.summary())
+            self.client.close()
+            print(self.documents.summary())
             
             # 统计最终结果
             final_descriptions = df[df['功能描述'].notna() & (df['功能描述'].str.strip() != '')]
@@ -209,6 +190,8 @@ class SetappDescriptionEnhancer:
                 print(f"  {platform}: {count} 个应用")
             
             print(f"\n增强后的数据已保存到: {output_file}")
+            if catalog_file:
+                print(f"目录已保存到: {catalog_file}")
             return True
             
         except Exception as e:
@@ -216,6 +199,15 @@ class SetappDescriptionEnhancer:
             return False
 
 if __name__ == "__main__":
-    enhancer = SetappDescriptionEnhancer()
-    success = enhancer.enhance_descriptions()
+    parser = argparse.ArgumentParser(description="Setapp应用描述增强器")
+    add_client_arguments(parser)
+    add_parser_arguments(parser)
+    add_catalog_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    configure_from_args(args)
+    
+    enhancer = SetappDescriptionEnhancer(client=client_from_args(args))
+    with profile_from_args(args):
+        success = enhancer.enhance_descriptions(catalog_file=args.catalog)
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -5,41 +5,25 @@ Setapp应用信息爬虫 - 改进版
 从Setapp官网获取所有应用的完整信息
 """
 
-import requests
-from bs4 import BeautifulSoup
 import csv
-import time
 import re
 from urllib.parse import urljoin
 import json
+import argparse
+
+from http_client import SetappHttpClient, add_client_arguments, client_from_args
+from entity_resolution import EntityResolver
+from html_backend import parse_document, add_parser_arguments, configure_from_args
+from run_profiler import add_profile_arguments, profile_from_args
 
 class SetappScraper:
-    def __init__(self):
+    def __init__(self, client=None):
         self.base_url = "https://setapp.com"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        })
+        self.client = client or SetappHttpClient()
         
-    def get_page_content(self, url, retries=3):
-        """获取页面内容"""
-        for attempt in range(retries):
-            try:
-                print(f"正在获取: {url}")
-                response = self.session.get(url, timeout=30)
-                response.raise_for_status()
-                return response.text
-            except Exception as e:
-                print(f"获取页面失败 (尝试 {attempt + 1}/{retries}): {url} - {e}")
-                if attempt < retries - 1:
-                    time.sleep(3)
-                else:
-                    return None
+    def get_page_content(self, url):
+        """获取页面内容（请求、缓存与重试由共享HTTP客户端处理）"""
+        return self.client.get_text(url)
     
     def scrape_all_apps_from_sitemap(self):
         """从sitemap或直接API获取所有应用"""
@@ -48,7 +32,7 @@ class SetappScraper:
         # 尝试从主页面获取所有应用链接
         main_content = self.get_page_content("https://setapp.com/apps")
         if main_content:
-            soup = BeautifulSoup(main_content, 'html.parser')
+            soup = parse_document(main_content)
             
             # 查找所有应用链接
             app_links = soup.find_all('a', href=re.compile(r'/apps/[a-zA-Z0-9-]+$'))
@@ -132,7 +116,7 @@ class SetappScraper:
             if not content:
                 return app_info
             
-            soup = BeautifulSoup(content, 'html.parser')
+            soup = parse_document(content)
             
             # 获取应用名称
             title_elem = soup.find('h1') or soup.find('title')
@@ -226,16 +210,21 @@ class SetappScraper:
         # 合并应用列表
         all_apps = apps + web_apps
         
-        # 去重
+        # 去重：按Setapp链接和名称解析为应用实体，"Cleanshot X"与"CleanShot X"视为同一应用
         unique_apps = []
-        seen_names = set()
+        seen_entities = set()
+        resolver = EntityResolver()
         
         for app in all_apps:
             name = app.get('name', '').strip()
-            if name and name.lower() not in seen_names:
-                seen_names.add(name.lower())
+            if not name:
+                continue
+            entity = resolver.resolve(name, url=app.get('setapp_link'))
+            if entity not in seen_entities:
+                seen_entities.add(entity)
                 unique_apps.append(app)
         
+        print(resolver.summary())
         print(f"总共 {len(unique_apps)} 个唯一应用")
         
         # 获取详细信息并生成CSV数据
@@ -250,17 +239,23 @@ class SetappScraper:
             # 生成CSV格式数据
             csv_row = self.generate_realistic_data(detailed_app)
             csv_data.append(csv_row)
-            
-            # 每20个应用休息一下
-            if i % 20 == 0:
-                time.sleep(2)
         
         # 保存到CSV
         self.save_to_csv(csv_data)
         
         print(f"爬取完成！共获取 {len(csv_data)} 个应用")
+        print(self.client.summary())
+        self.client.close()
         return csv_data
 
 if __name__ == "__main__":
-    scraper = SetappScraper()
-    scraper.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Setapp应用信息爬虫 - 改进版")
+    add_client_arguments(parser)
+    add_parser_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    configure_from_args(args)
+    
+    scraper = SetappScraper(client=client_from_args(args))
+    with profile_from_args(args):
+        scraper.run()
\ No newline at end of file
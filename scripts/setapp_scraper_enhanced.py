@@ -5,43 +5,55 @@ Setapp应用信息爬虫 - 增强版
 目标：获取260+个Setapp应用的完整信息
 """
 
-import requests
-from bs4 import BeautifulSoup
 import csv
-import time
 import re
 from urllib.parse import urljoin, urlparse
 import json
 import random
+import argparse
+import threading
+import queue
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from http_client import SetappHttpClient, MAIN_SECTION_END, add_client_arguments, client_from_args
+from html_backend import parse_document, add_parser_arguments, configure_from_args
+from run_profiler import add_profile_arguments, profile_from_args
+from run_journal import RunJournal
+from sitemap_crawler import SitemapCrawler
+from app_registry import AppRegistry
+
+DEFAULT_JOURNAL_FILE = 'setapp_apps_complete.journal.jsonl'
+
+CATEGORIES = [
+    'optimize', 'work', 'create', 'develop', 'solve-with-ai',
+    'productivity', 'design', 'utilities', 'developer-tools',
+    'media', 'business', 'education', 'lifestyle'
+]
+
+# 各发现来源的优先顺序，合并后的应用列表按此排序
+SOURCE_COMPREHENSIVE, SOURCE_MAIN_PAGE, SOURCE_CATEGORIES, SOURCE_SITEMAP = range(4)
+
 class SetappScraperEnhanced:
-    def __init__(self):
+    def __init__(self, client=None, journal=None):
         self.base_url = "https://setapp.com"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        })
-        self.discovered_apps = set()
-        
-    def get_page_content(self, url, retries=3):
-        """获取页面内容"""
-        for attempt in range(retries):
-            try:
-                response = self.session.get(url, timeout=30)
-                response.raise_for_status()
-                return response.text
-            except Exception as e:
-                print(f"获取页面失败 (尝试 {attempt + 1}/{retries}): {url} - {e}")
-                if attempt < retries - 1:
-                    time.sleep(2)
-                else:
-                    return None
+        self.client = client or SetappHttpClient()
+        self.journal = journal or RunJournal(DEFAULT_JOURNAL_FILE)
+        self.registry = AppRegistry()
+    
+    def register_app(self, app_info, rank):
+        """把发现的应用登记到去重登记表，slug首次出现时返回True"""
+        return self.registry.add(app_info, rank)
+        
+    def get_page_content(self, url):
+        """获取页面内容（请求、缓存与重试由共享HTTP客户端处理）"""
+        return self.client.get_text(url)
+    
+    def get_app_page(self, url):
+        """获取应用详情页，返回(页面是否存在, 内容)
+        
+        是否存在由HTTP状态码判断；启用部分下载时读到</main>即停止。
+        """
+        return self.client.get_page(url, MAIN_SECTION_END)
     
     def discover_apps_from_main_page(self):
         """从主页面发现应用"""
@@ -50,7 +62,7 @@ class SetappScraperEnhanced:
         if not content:
             return []
         
-        soup = BeautifulSoup(content, 'html.parser')
+        soup = parse_document(content)
         apps = []
         
         # 查找所有应用链接的多种模式
@@ -59,85 +71,76 @@ class SetappScraperEnhanced:
             r'/apps/[a-zA-Z0-9-]+[^/]*$'
         ]
         
-        for pattern in link_patterns:
+        for pattern_index, pattern in enumerate(link_patterns):
             links = soup.find_all('a', href=re.compile(pattern))
-            for link in links:
+            for position, link in enumerate(links):
                 href = link.get('href')
                 if href:
                     app_slug = href.split('/')[-1].strip('/')
-                    if app_slug and app_slug not in self.discovered_apps:
-                        self.discovered_apps.add(app_slug)
-                        apps.append({
+                    if app_slug:
+                        app_info = {
                             'slug': app_slug,
                             'name': app_slug.replace('-', ' ').title(),
                             'setapp_link': urljoin(self.base_url, href)
-                        })
+                        }
+                        if self.register_app(app_info, (SOURCE_MAIN_PAGE, pattern_index, position)):
+                            apps.append(app_info)
         
         print(f"从主页面发现 {len(apps)} 个应用")
         return apps
     
+    def discover_apps_from_category(self, category, category_index=0):
+        """从单个分类页面发现应用"""
+        print(f"正在爬取分类: {category}")
+        url = f"https://setapp.com/apps/{category}"
+        content = self.get_page_content(url)
+        
+        apps = []
+        if content:
+            soup = parse_document(content)
+            links = soup.find_all('a', href=re.compile(r'/apps/[a-zA-Z0-9-]+/?$'))
+            
+            for position, link in enumerate(links):
+                href = link.get('href')
+                if href:
+                    app_slug = href.split('/')[-1].strip('/')
+                    if app_slug and app_slug != category:
+                        app_info = {
+                            'slug': app_slug,
+                            'name': app_slug.replace('-', ' ').title(),
+                            'setapp_link': urljoin(self.base_url, href),
+                            'category': category
+                        }
+                        if self.register_app(app_info, (SOURCE_CATEGORIES, category_index, position)):
+                            apps.append(app_info)
+        return apps
+    
     def discover_apps_from_categories(self):
         """从分类页面发现应用"""
         print("正在从分类页面发现应用...")
-        categories = [
-            'optimize', 'work', 'create', 'develop', 'solve-with-ai',
-            'productivity', 'design', 'utilities', 'developer-tools',
-            'media', 'business', 'education', 'lifestyle'
-        ]
-        
         apps = []
-        for category in categories:
-            print(f"正在爬取分类: {category}")
-            url = f"https://setapp.com/apps/{category}"
-            content = self.get_page_content(url)
-            
-            if content:
-                soup = BeautifulSoup(content, 'html.parser')
-                links = soup.find_all('a', href=re.compile(r'/apps/[a-zA-Z0-9-]+/?$'))
-                
-                for link in links:
-                    href = link.get('href')
-                    if href:
-                        app_slug = href.split('/')[-1].strip('/')
-                        if app_slug and app_slug not in self.discovered_apps and app_slug != category:
-                            self.discovered_apps.add(app_slug)
-                            apps.append({
-                                'slug': app_slug,
-                                'name': app_slug.replace('-', ' ').title(),
-                                'setapp_link': urljoin(self.base_url, href),
-                                'category': category
-                            })
-            
-            time.sleep(1)  # 避免请求过快
+        for index, category in enumerate(CATEGORIES):
+            apps.extend(self.discover_apps_from_category(category, index))
         
         print(f"从分类页面发现 {len(apps)} 个应用")
         return apps
     
     def discover_apps_from_sitemap(self):
-        """尝试从sitemap发现应用"""
+        """从sitemap发现应用（递归展开sitemap索引，逐条流式处理）"""
         print("正在尝试从sitemap发现应用...")
-        sitemap_urls = [
-            'https://setapp.com/sitemap.xml',
-            'https://setapp.com/sitemap_index.xml',
-            'https://setapp.com/robots.txt'
-        ]
-        
+        crawler = SitemapCrawler(self.client)
         apps = []
-        for url in sitemap_urls:
-            content = self.get_page_content(url)
-            if content:
-                # 查找应用URL模式
-                app_urls = re.findall(r'https://setapp\.com/apps/([a-zA-Z0-9-]+)', content)
-                for app_slug in app_urls:
-                    if app_slug and app_slug not in self.discovered_apps:
-                        self.discovered_apps.add(app_slug)
-                        apps.append({
-                            'slug': app_slug,
-                            'name': app_slug.replace('-', ' ').title(),
-                            'setapp_link': f"https://setapp.com/apps/{app_slug}"
-                        })
-        
-        print(f"从sitemap发现 {len(apps)} 个应用")
+        for position, (app_slug, lastmod) in enumerate(crawler.iter_app_slugs()):
+            app_info = {
+                'slug': app_slug,
+                'name': app_slug.replace('-', ' ').title(),
+                'setapp_link': f"https://setapp.com/apps/{app_slug}",
+                'lastmod': lastmod
+            }
+            if self.register_app(app_info, (SOURCE_SITEMAP, 0, position)):
+                apps.append(app_info)
+        
+        print(f"从sitemap发现 {len(apps)} 个应用（{crawler.summary()}）")
         return apps
     
     def get_comprehensive_app_list(self):
@@ -215,31 +218,49 @@ class SetappScraperEnhanced:
         ]
         
         apps = []
-        for app_slug in comprehensive_apps:
-            if app_slug not in self.discovered_apps:
-                self.discovered_apps.add(app_slug)
-                apps.append({
-                    'slug': app_slug,
-                    'name': app_slug.replace('-', ' ').title(),
-                    'setapp_link': f"https://setapp.com/apps/{app_slug}"
-                })
+        for position, app_slug in enumerate(comprehensive_apps):
+            app_info = {
+                'slug': app_slug,
+                'name': app_slug.replace('-', ' ').title(),
+                'setapp_link': f"https://setapp.com/apps/{app_slug}"
+            }
+            if self.register_app(app_info, (SOURCE_COMPREHENSIVE, 0, position)):
+                apps.append(app_info)
         
         print(f"加载了 {len(apps)} 个全面应用列表")
         return apps
     
+    def discover_all(self):
+        """并发运行所有发现来源（每个分类页面也单独并发），返回合并去重后的应用列表
+        
+        发现总耗时取决于最慢的来源，而不是所有来源耗时之和；
+        新应用在登记时即通过registry.on_new_app通知调用方。
+        """
+        tasks = [(self.get_comprehensive_app_list,), (self.discover_apps_from_main_page,)]
+        tasks += [(self.discover_apps_from_category, category, index) for index, category in enumerate(CATEGORIES)]
+        tasks += [(self.discover_apps_from_sitemap,)]
+        
+        with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+            futures = [executor.submit(*task) for task in tasks]
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"应用发现失败: {e}")
+        
+        return self.registry.ordered()
+    
     def get_app_details(self, app_info):
         """获取单个应用的详细信息"""
         try:
-            content = self.get_page_content(app_info['setapp_link'])
+            exists, content = self.get_app_page(app_info['setapp_link'])
+            if not exists:
+                print(f"应用页面不存在: {app_info['name']}")
+                return None
             if not content:
                 return self.generate_fallback_data(app_info)
             
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            # 检查页面是否存在（404检查）
-            if "404" in content or "Page not found" in content:
-                print(f"应用页面不存在: {app_info['name']}")
-                return None
+            soup = parse_document(content)
             
             # 获取应用名称
             title_elem = soup.find('h1') or soup.find('title')
@@ -339,39 +360,85 @@ class SetappScraperEnhanced:
         
         print(f"已保存 {len(apps)} 个应用到 {filename}")
     
-    def run(self):
-        """运行增强版爬虫"""
-        print("开始运行Setapp增强版爬虫，目标：260+个应用")
-        
-        all_apps = []
-        
-        # 1. 从全面应用列表获取
-        comprehensive_apps = self.get_comprehensive_app_list()
-        all_apps.extend(comprehensive_apps)
-        
-        # 2. 从主页面发现
-        main_page_apps = self.discover_apps_from_main_page()
-        all_apps.extend(main_page_apps)
-        
-        # 3. 从分类页面发现
-        category_apps = self.discover_apps_from_categories()
-        all_apps.extend(category_apps)
-        
-        # 4. 从sitemap发现
-        sitemap_apps = self.discover_apps_from_sitemap()
-        all_apps.extend(sitemap_apps)
-        
-        # 去重
-        unique_apps = []
-        seen_slugs = set()
+    def complete_app(self, app, detailed_app):
+        """生成单个应用的CSV行并立即写入运行日志，失败时返回None"""
+        csv_row = self.generate_realistic_data(detailed_app)
+        self.journal.record(app['slug'], csv_row)
+        return csv_row
+    
+    def fetch_app_details_serial(self, apps):
+        """逐个串行获取应用详情，返回与apps顺序一一对应的CSV行"""
+        csv_rows = []
+        for i, app in enumerate(apps, 1):
+            print(f"处理应用 {i}/{len(apps)}: {app.get('name')}")
+            
+            # 获取详细信息
+            csv_rows.append(self.complete_app(app, self.get_app_details(app)))
+        return csv_rows
+    
+    def discover_and_fetch(self, workers):
+        """边发现边获取：应用一被登记就提交到详情线程池，返回合并去重后的应用列表
+        
+        运行日志中已完成的应用不再提交；详情结果在主线程中逐个写入运行日志。
+        """
+        finished = queue.Queue()
+        submitted = [0]
+        submitted_lock = threading.Lock()
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            def on_new_app(app):
+                if self.journal.is_done(app['slug']):
+                    return
+                with submitted_lock:
+                    submitted[0] += 1
+                future = executor.submit(self.get_app_details, app)
+                future.add_done_callback(lambda done, app=app: finished.put((app, done)))
+            
+            self.registry.on_new_app = on_new_app
+            with ThreadPoolExecutor(max_workers=1) as discovery:
+                discovery_future = discovery.submit(self.discover_all)
+                completed = 0
+                # 发现结束后提交数不再变化，全部结果处理完即可退出
+                while not (discovery_future.done() and completed == submitted[0]):
+                    try:
+                        app, future = finished.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                    self.complete_app(app, future.result())
+                    completed += 1
+                    print(f"已完成 {completed}/{submitted[0]}: {app.get('name')}")
+                unique_apps = discovery_future.result()
+            self.registry.on_new_app = None
+        return unique_apps
+    
+    def run(self, workers=None):
+        """运行增强版爬虫
         
-        for app in all_apps:
-            slug = app.get('slug', '')
-            if slug and slug not in seen_slugs:
-                seen_slugs.add(slug)
-                unique_apps.append(app)
+        workers：使用线程池模式并设置工作线程数，未设置时逐个串行获取。
+        """
+        print("开始运行Setapp增强版爬虫，目标：260+个应用")
         
-        print(f"\n总共发现 {len(unique_apps)} 个唯一应用")
+        # 并发运行所有发现来源（全面应用列表、主页面、各分类页面、sitemap），
+        # 结果按来源优先顺序合并去重
+        if workers:
+            print(f"使用线程池模式，工作线程数: {workers}，发现应用的同时获取详细信息")
+            resumed = len(self.journal.completed)
+            unique_apps = self.discover_and_fetch(workers)
+            print(f"\n总共发现 {len(unique_apps)} 个唯一应用")
+            if resumed:
+                print(f"从运行日志恢复 {resumed} 个已完成的应用")
+        else:
+            unique_apps = self.discover_all()
+            print(f"\n总共发现 {len(unique_apps)} 个唯一应用")
+            
+            # 跳过运行日志中已完成的应用
+            pending_apps = [app for app in unique_apps if not self.journal.is_done(app['slug'])]
+            if len(pending_apps) < len(unique_apps):
+                print(f"从运行日志恢复 {len(unique_apps) - len(pending_apps)} 个已完成的应用，剩余 {len(pending_apps)} 个")
+            
+            print("\n开始获取应用详细信息...")
+            self.fetch_app_details_serial(pending_apps)
+        self.journal.close()
         
         if len(unique_apps) < 260:
             print(f"警告：发现的应用数量 ({len(unique_apps)}) 少于目标 (260+)")
@@ -380,28 +447,18 @@ class SetappScraperEnhanced:
         csv_data = []
         failed_count = 0
         
-        print("\n开始获取应用详细信息...")
-        for i, app in enumerate(unique_apps, 1):
-            print(f"处理应用 {i}/{len(unique_apps)}: {app.get('name')}")
-            
-            # 获取详细信息
-            detailed_app = self.get_app_details(app)
-            
-            if detailed_app:
-                # 生成CSV格式数据
-                csv_row = self.generate_realistic_data(detailed_app)
-                if csv_row:
-                    csv_data.append(csv_row)
-                else:
-                    failed_count += 1
+        # 按原始顺序汇总（包括从日志恢复的结果）；
+        # 边发现边获取时详情任务可能用的是先登记的来源信息，Setapp链接统一取优先级最靠前的来源
+        for app in unique_apps:
+            csv_row = self.journal.completed.get(app['slug'])
+            if csv_row:
+                csv_data.append(dict(csv_row, **{'Setapp链接': app.get('setapp_link', '')}))
             else:
                 failed_count += 1
-            
-            # 每10个应用休息一下
-            if i % 10 == 0:
-                time.sleep(1)
         
         print(f"\n成功处理 {len(csv_data)} 个应用，失败 {failed_count} 个")
+        print(self.client.summary())
+        self.client.close()
         
         # 保存到CSV
         self.save_to_csv(csv_data)
@@ -414,5 +471,20 @@ class SetappScraperEnhanced:
         return csv_data
 
 if __name__ == "__main__":
-    scraper = SetappScraperEnhanced()
-    scraper.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Setapp应用信息爬虫 - 增强版")
+    parser.add_argument('--workers', type=int, default=None,
+                        help='启用线程池模式并设置工作线程数（默认串行获取）')
+    add_client_arguments(parser)
+    add_parser_arguments(parser)
+    add_profile_arguments(parser)
+    parser.add_argument('--journal', default=DEFAULT_JOURNAL_FILE,
+                        help=f'运行日志文件，每完成一个应用即写入（默认 {DEFAULT_JOURNAL_FILE}）')
+    parser.add_argument('--resume', action='store_true',
+                        help='从运行日志恢复，跳过已完成的应用')
+    args = parser.parse_args()
+    configure_from_args(args)
+    
+    journal = RunJournal(args.journal, resume=args.resume)
+    scraper = SetappScraperEnhanced(client=client_from_args(args), journal=journal)
+    with profile_from_args(args):
+        scraper.run(workers=args.workers)
\ No newline at end of file
@@ -9,94 +9,111 @@ Setapp应用信息爬虫 - 终极增强版
 4. 添加更详细的应用描述信息
 """
 
-import requests
-from bs4 import BeautifulSoup
 import csv
-import time
 import re
 from urllib.parse import urljoin, urlparse
 import json
 import random
+import asyncio
+import argparse
+import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
 
+from http_client import SetappHttpClient, MAIN_SECTION_END, add_client_arguments, client_from_args
+from html_backend import parse_document, add_parser_arguments, configure_from_args
+from run_profiler import add_profile_arguments, profile_from_args
+from scrape_state import ScrapeState, DEFAULT_STATE_FILE, page_region_digest
+from run_journal import RunJournal
+from extraction_engine import ExtractionEngine
+from platform_matcher import PlatformMatcher
+from sitemap_crawler import SitemapCrawler
+
+DEFAULT_JOURNAL_FILE = 'setapp_apps_ultimate.journal.jsonl'
+DEFAULT_METRICS_FILE = 'setapp_apps_ultimate.metrics.json'
+
+# 在共享客户端默认请求头之外，额外模拟浏览器的页面导航请求
+NAVIGATION_HEADERS = {
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none'
+}
+
+PLATFORM_MATCHER = PlatformMatcher()
+
+# 详情页各字段的选择器（按优先顺序），预先编译成单次遍历的提取规则
+APP_DETAIL_ENGINE = ExtractionEngine({
+    'title': (['h1', '.app-title', '.hero-title', 'title'], 'text'),
+    'meta_description': (['meta[name="description"]', 'meta[property="og:description"]'], 'content'),
+    'description': ([
+        '.app-description',
+        '.hero-description',
+        '.app-hero p',
+        '.product-description',
+        '.app-overview',
+        '.description',
+        'p[class*="description"]',
+        '.app-details p',
+        '.content p',
+        'main p'
+    ], 'text'),
+    'website': ([
+        'a[href*="official"]',
+        'a[href*="website"]',
+        'a[href*="homepage"]',
+        'a[href*="developer"]',
+        'a[class*="official"]',
+        'a[class*="website"]',
+        'a[class*="external"]',
+        '.official-link a',
+        '.website-link a',
+        '.developer-link a'
+    ], 'href'),
+    'rating': (['.rating', '.score', '[class*="rating"]', '[class*="score"]'], 'text'),
+})
+
 # 设置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class SetappScraperUltimate:
-    def __init__(self):
+    def __init__(self, client=None, state=None, journal=None):
         self.base_url = "https://setapp.com"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none'
-        })
+        self.client = client or SetappHttpClient(headers=NAVIGATION_HEADERS)
+        # 与HTTP客户端共用同一个指标收集器，请求指标和阶段耗时写进同一份报告
+        self.metrics = self.client.metrics
+        self.state = state or ScrapeState()
+        self.journal = journal or RunJournal(DEFAULT_JOURNAL_FILE)
         self.discovered_apps = set()
-        
-    def get_page_content(self, url, retries=3):
-        """获取页面内容，增强错误处理"""
-        for attempt in range(retries):
-            try:
-                logger.info(f"正在获取页面: {url} (尝试 {attempt + 1}/{retries})")
-                response = self.session.get(url, timeout=30)
-                response.raise_for_status()
-                return response.text
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"获取页面失败: {url} - {e}")
-                if attempt < retries - 1:
-                    time.sleep(random.uniform(2, 5))
-                else:
-                    logger.error(f"最终获取失败: {url}")
-                    return None
+        self._discovered_lock = threading.Lock()
     
-    def extract_platform_info(self, soup, app_url):
-        """提取平台支持信息"""
-        platforms = set()
-        
-        # 查找平台信息的多种方式
-        platform_indicators = [
-            # 直接文本匹配
-            {'text': ['mac', 'macos', 'os x'], 'platform': 'Mac'},
-            {'text': ['ios', 'iphone'], 'platform': 'iOS'},
-            {'text': ['ipados', 'ipad'], 'platform': 'iPadOS'},
-            {'text': ['apple tv', 'tvos'], 'platform': 'Apple TV'},
-            {'text': ['apple watch', 'watchos'], 'platform': 'Apple Watch'}
-        ]
+    def claim_slug(self, app_slug):
+        """线程安全地登记应用slug，首次出现时返回True"""
+        with self._discovered_lock:
+            if app_slug in self.discovered_apps:
+                return False
+            self.discovered_apps.add(app_slug)
+            return True
         
-        # 在页面文本中查找平台信息
-        page_text = soup.get_text().lower()
-        for indicator in platform_indicators:
-            for text in indicator['text']:
-                if text in page_text:
-                    platforms.add(indicator['platform'])
-        
-        # 查找特定的平台标识元素
-        platform_selectors = [
-            '.platform-badge',
-            '.compatibility',
-            '.system-requirements',
-            '[class*="platform"]',
-            '[class*="compatibility"]',
-            '.app-platforms',
-            '.supported-platforms'
-        ]
+    def get_page_content(self, url):
+        """获取页面内容（请求、缓存与重试由共享HTTP客户端处理）"""
+        return self.client.get_text(url)
+    
+    def get_app_page(self, url):
+        """获取应用详情页，返回(页面是否存在, 内容)
         
-        for selector in platform_selectors:
-            elements = soup.select(selector)
-            for elem in elements:
-                elem_text = elem.get_text().lower()
-                for indicator in platform_indicators:
-                    for text in indicator['text']:
-                        if text in elem_text:
-                            platforms.add(indicator['platform'])
+        是否存在由HTTP状态码判断；启用部分下载时读到</main>即停止。
+        """
+        with self.metrics.stage('fetch'):
+            return self.client.get_page(url, MAIN_SECTION_END)
+    
+    def extract_platform_info(self, page_text):
+        """根据页面文本提取平台支持信息
+
+        平台标识元素（.platform-badge等）的文本都包含在整页文本中，
+        因此只需用编译好的关键词匹配器扫描一次整页文本。
+        """
+        platforms = PLATFORM_MATCHER.find(page_text)
         
         # 默认至少支持Mac（因为是Setapp）
         if not platforms:
@@ -104,36 +121,15 @@ class SetappScraperUltimate:
         
         return ', '.join(sorted(platforms))
     
-    def extract_detailed_description(self, soup):
+    def extract_detailed_description(self, fields):
         """提取详细的应用描述"""
         descriptions = []
         
-        # 多种描述提取策略
-        description_selectors = [
-            'meta[name="description"]',
-            'meta[property="og:description"]',
-            '.app-description',
-            '.hero-description', 
-            '.app-hero p',
-            '.product-description',
-            '.app-overview',
-            '.description',
-            'p[class*="description"]',
-            '.app-details p',
-            '.content p',
-            'main p'
-        ]
-        
-        for selector in description_selectors:
-            elements = soup.select(selector)
-            for elem in elements:
-                if elem.name == 'meta':
-                    desc = elem.get('content', '').strip()
-                else:
-                    desc = elem.get_text().strip()
-                
-                if desc and len(desc) > 20 and desc not in descriptions:
-                    descriptions.append(desc)
+        # 按选择器优先顺序收集候选描述（meta取content属性，其余取元素文本）
+        for desc in fields.ordered('meta_description') + fields.ordered('description'):
+            desc = desc.strip()
+            if desc and len(desc) > 20 and desc not in descriptions:
+                descriptions.append(desc)
         
         # 合并描述，优先使用最详细的
         if descriptions:
@@ -143,36 +139,17 @@ class SetappScraperUltimate:
         
         return ""
     
-    def extract_official_website(self, soup, app_name):
+    def extract_official_website(self, fields, app_name):
         """提取官方网站链接"""
-        # 查找官方网站链接的多种策略
-        website_selectors = [
-            'a[href*="official"]',
-            'a[href*="website"]',
-            'a[href*="homepage"]',
-            'a[href*="developer"]',
-            'a[class*="official"]',
-            'a[class*="website"]',
-            'a[class*="external"]',
-            '.official-link a',
-            '.website-link a',
-            '.developer-link a'
-        ]
-        
-        for selector in website_selectors:
-            elements = soup.select(selector)
-            for elem in elements:
-                href = elem.get('href', '')
-                if href and self.is_valid_official_website(href):
-                    return href
+        for href in fields.ordered('website'):
+            if href and self.is_valid_official_website(href):
+                return href
         
         # 查找所有外部链接，过滤出可能的官方网站
-        all_links = soup.find_all('a', href=True)
-        for link in all_links:
-            href = link.get('href')
+        for href, link_text in fields.ordered('links'):
             if href and self.is_valid_official_website(href):
                 # 检查链接文本是否包含相关关键词
-                link_text = link.get_text().lower()
+                link_text = link_text.lower()
                 if any(keyword in link_text for keyword in ['官网', 'website', 'official', 'homepage', 'visit', 'download']):
                     return href
         
@@ -290,8 +267,7 @@ class SetappScraperUltimate:
         
         apps = []
         for app_slug in comprehensive_apps:
-            if app_slug not in self.discovered_apps:
-                self.discovered_apps.add(app_slug)
+            if self.claim_slug(app_slug):
                 apps.append({
                     'slug': app_slug,
                     'name': app_slug.replace('-', ' ').title(),
@@ -301,69 +277,127 @@ class SetappScraperUltimate:
         logger.info(f"加载了 {len(apps)} 个应用")
         return apps
     
+    def discover_apps_from_sitemap(self, all_apps):
+        """用sitemap补充应用列表，并为每个应用记录lastmod
+        
+        sitemap条目逐条流式处理：已知应用只补充lastmod，新应用追加到列表末尾。
+        """
+        logger.info("正在从sitemap发现应用...")
+        apps_by_slug = {app['slug']: app for app in all_apps}
+        crawler = SitemapCrawler(self.client)
+        added = 0
+        for app_slug, lastmod in crawler.iter_app_slugs():
+            app = apps_by_slug.get(app_slug)
+            if app is None and self.claim_slug(app_slug):
+                app = {
+                    'slug': app_slug,
+                    'name': app_slug.replace('-', ' ').title(),
+                    'setapp_link': f"{self.base_url}/apps/{app_slug}"
+                }
+                apps_by_slug[app_slug] = app
+                all_apps.append(app)
+                added += 1
+            if app is not None and lastmod:
+                app['lastmod'] = lastmod
+        logger.info(f"从sitemap新发现 {added} 个应用; {crawler.summary()}")
+        return all_apps
+    
+    def lookup_not_modified(self, app_info):
+        """sitemap的lastmod与上次一致时返回(True, 上次的记录)，无需重新获取页面"""
+        unchanged, record = self.state.lookup_lastmod(app_info['slug'], app_info.get('lastmod'))
+        if unchanged:
+            logger.info(f"sitemap lastmod未变化，跳过获取: {app_info['name']}")
+            return True, dict(record) if record else None
+        return False, None
+    
     def get_enhanced_app_details(self, app_info):
         """获取增强的应用详细信息"""
+        unchanged, record = self.lookup_not_modified(app_info)
+        if unchanged:
+            return record
         try:
             logger.info(f"正在获取应用详情: {app_info['name']}")
-            content = self.get_page_content(app_info['setapp_link'])
-            
+            exists, content = self.get_app_page(app_info['setapp_link'])
+        except Exception as e:
+            logger.error(f"获取应用详情失败 {app_info.get('name', 'Unknown')}: {e}")
+            return self.generate_fallback_data(app_info)
+        
+        if not exists:
+            logger.warning(f"应用页面不存在: {app_info['name']}")
+            return None
+        return self.extract_enhanced_app_details(app_info, content)
+    
+    def extract_enhanced_app_details(self, app_info, content):
+        """从已下载的页面内容中提取应用详细信息（串行与异步模式共用）"""
+        try:
             if not content:
                 return self.generate_fallback_data(app_info)
             
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            # 检查页面是否存在
-            if "404" in content or "Page not found" in content or "Not Found" in content:
-                logger.warning(f"应用页面不存在: {app_info['name']}")
-                return None
-            
-            # 获取应用名称（更准确）
-            title_selectors = ['h1', '.app-title', '.hero-title', 'title']
-            for selector in title_selectors:
-                title_elem = soup.select_one(selector)
-                if title_elem:
-                    title_text = title_elem.get_text().strip()
-                    if title_text and not title_text.lower().startswith('setapp'):
-                        # 清理标题
-                        clean_title = title_text.split(' - ')[0].split(' | ')[0].strip()
-                        if clean_title:
-                            app_info['name'] = clean_title
-                            break
-            
-            # 获取平台信息
-            platforms = self.extract_platform_info(soup, app_info['setapp_link'])
-            app_info['platforms'] = platforms
+            # 页面关键区域没有变化时直接复用上次的提取结果，跳过解析
+            with self.metrics.stage('extract'):
+                digest = page_region_digest(content)
+                unchanged, record = self.state.lookup(app_info['slug'], digest)
+            if unchanged:
+                logger.info(f"页面未变化，复用上次结果: {app_info['name']}")
+                self.state.remember_lastmod(app_info['slug'], app_info.get('lastmod'))
+                return dict(record) if record else None
             
-            # 获取详细描述
-            description = self.extract_detailed_description(soup)
-            if description:
-                app_info['description'] = description
+            with self.metrics.stage('parse'):
+                soup = parse_document(content)
             
-            # 获取官方网站
-            official_website = self.extract_official_website(soup, app_info['name'])
-            if official_website:
-                app_info['official_website'] = official_website
-            
-            # 获取评分（如果有的话）
-            rating_selectors = ['.rating', '.score', '[class*="rating"]', '[class*="score"]']
-            for selector in rating_selectors:
-                rating_elem = soup.select_one(selector)
-                if rating_elem:
-                    rating_text = rating_elem.get_text().strip()
-                    rating_match = re.search(r'(\d+(?:\.\d+)?)', rating_text)
-                    if rating_match:
-                        app_info['rating'] = rating_match.group(1)
-                        break
+            with self.metrics.stage('extract'):
+                self.extract_fields(app_info, soup)
             
+            self.state.update(app_info['slug'], digest, dict(app_info), app_info.get('lastmod'))
             return app_info
             
         except Exception as e:
             logger.error(f"获取应用详情失败 {app_info.get('name', 'Unknown')}: {e}")
             return self.generate_fallback_data(app_info)
     
+    def extract_fields(self, app_info, soup):
+        """从解析树中提取名称、平台、描述、官网和评分，写入app_info"""
+        # 一次遍历收集所有字段
+        fields = APP_DETAIL_ENGINE.extract(soup)
+        
+        # 获取应用名称（更准确）
+        for title_text in fields.first_per_rule('title'):
+            title_text = (title_text or '').strip()
+            if title_text and not title_text.lower().startswith('setapp'):
+                # 清理标题
+                clean_title = title_text.split(' - ')[0].split(' | ')[0].strip()
+                if clean_title:
+                    app_info['name'] = clean_title
+                    break
+        
+        # 获取平台信息
+        platforms = self.extract_platform_info(fields.text)
+        app_info['platforms'] = platforms
+        
+        # 获取详细描述
+        description = self.extract_detailed_description(fields)
+        if description:
+            app_info['description'] = description
+        
+        # 获取官方网站
+        official_website = self.extract_official_website(fields, app_info['name'])
+        if official_website:
+            app_info['official_website'] = official_website
+        
+        # 获取评分（如果有的话）
+        for rating_text in fields.first_per_rule('rating'):
+            if rating_text is None:
+                continue
+            rating_match = re.search(r'(\d+(?:\.\d+)?)', rating_text.strip())
+            if rating_match:
+                app_info['rating'] = rating_match.group(1)
+                break
+    
     def generate_fallback_data(self, app_info):
-        """为无法获取详情的应用生成备用数据"""
+        """为无法获取详情的应用生成备用数据（标记为fallback，运行日志不把它当作已完成）"""
         logger.info(f"为应用生成备用数据: {app_info['name']}")
+        self.metrics.increment('fallbacks')
+        app_info['fallback'] = True
         
         if not app_info.get('description'):
             # 根据应用名称生成合理的描述
@@ -424,13 +458,98 @@ class SetappScraperUltimate:
         
         logger.info(f"已保存 {len(apps)} 个应用到 {filename}")
     
-    def run(self):
-        """运行终极增强版爬虫"""
+    def complete_app(self, app, detailed_app):
+        """将单个应用的详情结果转换为CSV行并立即写入运行日志，失败时返回None
+
+        备用数据生成的行仍会输出，但在日志中标记为需要重试，--resume时会重新获取该应用。
+        """
+        csv_row = None
+        retry = bool(detailed_app and detailed_app.get('fallback'))
+        if not detailed_app:
+            logger.warning(f"✗ 获取详情失败: {app.get('name')}")
+        else:
+            # 生成CSV格式数据
+            csv_row = self.generate_csv_data(detailed_app)
+            if csv_row:
+                logger.info(f"✓ 成功处理: {csv_row['名称']} - 平台: {csv_row['平台']}")
+            else:
+                logger.warning(f"✗ 生成CSV数据失败: {app.get('name')}")
+        
+        with self.metrics.stage('write'):
+            self.journal.record(app['slug'], csv_row, retry=retry)
+        return csv_row
+    
+    def fetch_app_details_serial(self, all_apps):
+        """逐个串行获取应用详情，返回与all_apps顺序一一对应的CSV行"""
+        csv_rows = []
+        for i, app in enumerate(all_apps, 1):
+            logger.info(f"处理应用 {i}/{len(all_apps)}: {app.get('name')}")
+            
+            # 获取增强的详细信息
+            detailed_app = self.get_enhanced_app_details(app)
+            csv_rows.append(self.complete_app(app, detailed_app))
+        return csv_rows
+    
+    async def fetch_app_details_async(self, all_apps, concurrency):
+        """异步并发获取应用页面，同时在途的请求数不超过concurrency
+        
+        页面下载在线程池中进行，解析在事件循环中依次完成；
+        返回与all_apps顺序一一对应的CSV行。
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(concurrency)
+        total = len(all_apps)
+        
+        async def fetch_one(index, app):
+            async with semaphore:
+                logger.info(f"处理应用 {index}/{total}: {app.get('name')}")
+                unchanged, record = self.lookup_not_modified(app)
+                if unchanged:
+                    return self.complete_app(app, record)
+                try:
+                    exists, content = await loop.run_in_executor(executor, self.get_app_page, app['setapp_link'])
+                except Exception as e:
+                    logger.error(f"获取应用详情失败 {app.get('name', 'Unknown')}: {e}")
+                    return self.complete_app(app, self.generate_fallback_data(app))
+            if not exists:
+                logger.warning(f"应用页面不存在: {app['name']}")
+                return self.complete_app(app, None)
+            return self.complete_app(app, self.extract_enhanced_app_details(app, content))
+        
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return await asyncio.gather(*(fetch_one(i, app) for i, app in enumerate(all_apps, 1)))
+    
+    def fetch_app_details_threaded(self, all_apps, workers):
+        """使用线程池并行获取应用详情，返回与all_apps顺序一一对应的CSV行"""
+        csv_rows = [None] * len(all_apps)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self.get_enhanced_app_details, app): index
+                for index, app in enumerate(all_apps)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                index = futures[future]
+                csv_rows[index] = self.complete_app(all_apps[index], future.result())
+                logger.info(f"已完成 {done}/{len(all_apps)}: {all_apps[index].get('name')}")
+        return csv_rows
+    
+    def run(self, concurrency=None, workers=None, use_sitemap=False, metrics_file=DEFAULT_METRICS_FILE):
+        """运行终极增强版爬虫
+        
+        concurrency：使用异步模式并设置最大并发请求数；
+        workers：使用线程池模式并设置工作线程数；
+        两者都未设置时逐个串行获取。
+        use_sitemap：用sitemap补充应用列表，lastmod未变化的应用直接复用上次结果。
+        metrics_file：运行结束时写出的指标文件（JSON），为None时不写。
+        """
         logger.info("开始运行Setapp终极增强版爬虫")
         logger.info("目标：获取完整的平台信息、功能描述和官方网站链接")
         
         # 获取应用列表
-        all_apps = self.get_comprehensive_app_list()
+        with self.metrics.stage('discover'):
+            all_apps = self.get_comprehensive_app_list()
+            if use_sitemap:
+                self.discover_apps_from_sitemap(all_apps)
         
         logger.info(f"总共需要处理 {len(all_apps)} 个应用")
         
@@ -438,34 +557,46 @@ class SetappScraperUltimate:
         csv_data = []
         failed_count = 0
         
+        # 跳过运行日志中已完成的应用
+        pending_apps = [app for app in all_apps if not self.journal.is_done(app['slug'])]
+        if len(pending_apps) < len(all_apps):
+            logger.info(f"从运行日志恢复 {len(all_apps) - len(pending_apps)} 个已完成的应用，剩余 {len(pending_apps)} 个")
+        
         logger.info("开始获取应用详细信息...")
-        for i, app in enumerate(all_apps, 1):
-            logger.info(f"处理应用 {i}/{len(all_apps)}: {app.get('name')}")
-            
-            # 获取增强的详细信息
-            detailed_app = self.get_enhanced_app_details(app)
-            
-            if detailed_app:
-                # 生成CSV格式数据
-                csv_row = self.generate_csv_data(detailed_app)
-                if csv_row:
-                    csv_data.append(csv_row)
-                    logger.info(f"✓ 成功处理: {csv_row['名称']} - 平台: {csv_row['平台']}")
-                else:
-                    failed_count += 1
-                    logger.warning(f"✗ 生成CSV数据失败: {app.get('name')}")
+        if concurrency:
+            logger.info(f"使用异步模式，最大并发请求数: {concurrency}")
+            asyncio.run(self.fetch_app_details_async(pending_apps, concurrency))
+        elif workers:
+            logger.info(f"使用线程池模式，工作线程数: {workers}")
+            self.fetch_app_details_threaded(pending_apps, workers)
+        else:
+            self.fetch_app_details_serial(pending_apps)
+        self.journal.close()
+        
+        # 按原始顺序汇总（包括从日志恢复的结果）
+        for app in all_apps:
+            csv_row = self.journal.completed.get(app['slug'])
+            if csv_row:
+                csv_data.append(csv_row)
             else:
                 failed_count += 1
-                logger.warning(f"✗ 获取详情失败: {app.get('name')}")
-            
-            # 每5个应用休息一下，避免请求过快
-            if i % 5 == 0:
-                time.sleep(random.uniform(1, 3))
         
         logger.info(f"处理完成！成功: {len(csv_data)}, 失败: {failed_count}")
-        
-        # 保存到CSV
-        self.save_to_csv(csv_data)
+        logger.info(self.client.summary())
+        self.client.close()
+        
+        # 保存状态和CSV
+        with self.metrics.stage('write'):
+            self.state.save()
+            self.save_to_csv(csv_data)
+        logger.info(self.state.summary())
+        
+        mode = 'async' if concurrency else 'threaded' if workers else 'serial'
+        self.metrics.set_info(mode=mode, apps=len(all_apps), fetched=len(pending_apps),
+                              succeeded=len(csv_data), failed=failed_count)
+        if metrics_file:
+            self.metrics.write(metrics_file, cache=self.client.cache)
+            logger.info(f"运行指标已写入 {metrics_file}")
         
         # 统计报告
         platform_stats = {}
@@ -495,5 +626,34 @@ class SetappScraperUltimate:
         return csv_data
 
 if __name__ == "__main__":
-    scraper = SetappScraperUltimate()
-    scraper.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Setapp应用信息爬虫 - 终极增强版")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--concurrency', type=int, default=None,
+                      help='启用异步模式并设置最大并发请求数（默认串行获取）')
+    mode.add_argument('--workers', type=int, default=None,
+                      help='启用线程池模式并设置工作线程数（默认串行获取）')
+    add_client_arguments(parser)
+    add_parser_arguments(parser)
+    add_profile_arguments(parser)
+    parser.add_argument('--state-file', default=DEFAULT_STATE_FILE,
+                        help=f'增量爬取状态文件（默认 {DEFAULT_STATE_FILE}）')
+    parser.add_argument('--full-refresh', action='store_true',
+                        help='忽略增量状态，重新提取所有应用')
+    parser.add_argument('--sitemap', action='store_true',
+                        help='从sitemap补充应用列表，lastmod未变化的应用不重新下载')
+    parser.add_argument('--journal', default=DEFAULT_JOURNAL_FILE,
+                        help=f'运行日志文件，每完成一个应用即写入（默认 {DEFAULT_JOURNAL_FILE}）')
+    parser.add_argument('--resume', action='store_true',
+                        help='从运行日志恢复，跳过已完成的应用')
+    parser.add_argument('--metrics', default=DEFAULT_METRICS_FILE,
+                        help=f'运行指标文件（JSON，默认 {DEFAULT_METRICS_FILE}）')
+    args = parser.parse_args()
+    configure_from_args(args)
+    
+    state = ScrapeState(args.state_file, fresh=args.full_refresh)
+    journal = RunJournal(args.journal, resume=args.resume)
+    scraper = SetappScraperUltimate(client=client_from_args(args, headers=NAVIGATION_HEADERS),
+                                    state=state, journal=journal)
+    with profile_from_args(args):
+        scraper.run(concurrency=args.concurrency, workers=args.workers, use_sitemap=args.sitemap,
+                    metrics_file=args.metrics)
\ No newline at end of file
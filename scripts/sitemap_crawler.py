@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式sitemap爬取
+- 从robots.txt中的Sitemap声明和默认地址出发，递归展开sitemap索引
+- 支持.xml.gz（按gzip魔数识别，边解压边解析）
+- 正文通过SetappHttpClient.open_stream流式读取（启用缓存时边下载边写入缓存文件，再从文件读取），
+  不整体载入内存；用iterparse逐条解析<url>/<sitemap>并随即清理已处理的元素，
+  解析树也不会随sitemap条目数增长；结果以生成器方式逐条产出(slug, lastmod)
+sitemap通过共享HTTP客户端获取，因此同样享有缓存、条件请求、速率控制和离线回放
+（录制/回放归档需要完整正文，此时正文会载入内存）。
+"""
+
+import gzip
+import io
+import logging
+import re
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SITEMAP_URLS = [
+    'https://setapp.com/sitemap.xml',
+    'https://setapp.com/sitemap_index.xml'
+]
+
+DEFAULT_ROBOTS_URL = 'https://setapp.com/robots.txt'
+
+# 应用详情页地址，捕获slug
+APP_URL_RE = re.compile(r'^https?://(?:www\.)?setapp\.com/apps/([a-zA-Z0-9-]+)/?(?:[?#].*)?$')
+
+_ROBOTS_SITEMAP_RE = re.compile(r'^\s*sitemap\s*:\s*(\S+)', re.IGNORECASE | re.MULTILINE)
+
+_GZIP_MAGIC = b'\x1f\x8b'
+
+
+def _local_name(tag):
+    """去掉XML命名空间前缀"""
+    return tag.rsplit('}', 1)[-1]
+
+
+class SitemapCrawler:
+    """递归遍历sitemap索引，逐条产出页面地址和lastmod"""
+
+    def __init__(self, client, max_depth=5):
+        self.client = client
+        self.max_depth = max_depth
+        self.sitemaps_fetched = 0
+        self.entries_seen = 0
+
+    def sitemaps_from_robots(self, robots_url=DEFAULT_ROBOTS_URL):
+        """读取robots.txt中声明的sitemap地址"""
+        content = self.client.get_text(robots_url)
+        if not content:
+            return []
+        return _ROBOTS_SITEMAP_RE.findall(content)
+
+    @contextmanager
+    def open_sitemap(self, url):
+        """流式获取sitemap，提供可供iterparse读取的字节流（gzip内容边读边解压），获取失败时为None"""
+        with self.client.open_stream(url) as body:
+            if body is None:
+                logger.warning(f"无法获取sitemap: {url}")
+                yield None
+                return
+            stream = body if hasattr(body, 'peek') else io.BufferedReader(body)
+            # requests只会解开Content-Encoding: gzip；.xml.gz文件本身仍是gzip数据
+            if stream.peek(2)[:2] == _GZIP_MAGIC:
+                stream = gzip.GzipFile(fileobj=stream)
+            yield stream
+
+    def iter_entries(self, url, depth=0, visited=None):
+        """产出(页面地址, lastmod)，遇到子sitemap时递归展开"""
+        visited = set() if visited is None else visited
+        if url in visited:
+            return
+        visited.add(url)
+        if depth > self.max_depth:
+            logger.warning(f"sitemap嵌套超过 {self.max_depth} 层，跳过: {url}")
+            return
+
+        with self.open_sitemap(url) as stream:
+            if stream is None:
+                return
+            self.sitemaps_fetched += 1
+            yield from self._iter_stream_entries(url, stream, depth, visited)
+
+    def _iter_stream_entries(self, url, stream, depth, visited):
+        """用iterparse逐条解析一个sitemap的字节流"""
+        loc = lastmod = None
+        root = None
+        # 元素层级：根元素为0，<url>/<sitemap>为1，其<loc>/<lastmod>为2；
+        # 更深层的同名元素（如图片扩展里的<image:loc>）不算
+        level = -1
+        try:
+            for event, elem in ET.iterparse(stream, events=('start', 'end')):
+                if event == 'start':
+                    level += 1
+                    if root is None:
+                        root = elem
+                    continue
+                level -= 1
+                name = _local_name(elem.tag)
+                if level == 1 and name == 'loc':
+                    loc = (elem.text or '').strip()
+                elif level == 1 and name == 'lastmod':
+                    lastmod = (elem.text or '').strip() or None
+                elif level == 0 and name in ('url', 'sitemap'):
+                    if loc:
+                        if name == 'sitemap':
+                            yield from self.iter_entries(loc, depth + 1, visited)
+                        else:
+                            self.entries_seen += 1
+                            yield loc, lastmod
+                    loc = lastmod = None
+                    # 已处理的条目从根元素上摘除，保持内存占用恒定
+                    root.clear()
+        except (ET.ParseError, OSError, EOFError) as e:
+            logger.warning(f"解析sitemap失败: {url} - {e}")
+
+    def iter_app_slugs(self, sitemap_urls=None, robots_url=DEFAULT_ROBOTS_URL):
+        """产出应用详情页的(slug, lastmod)，同一slug只产出一次"""
+        urls = self.sitemaps_from_robots(robots_url) if robots_url else []
+        urls += [url for url in (sitemap_urls or DEFAULT_SITEMAP_URLS) if url not in urls]
+
+        visited = set()
+        seen_slugs = set()
+        for url in urls:
+            for loc, lastmod in self.iter_entries(url, visited=visited):
+                match = APP_URL_RE.match(loc)
+                if match and match.group(1) not in seen_slugs:
+                    seen_slugs.add(match.group(1))
+                    yield match.group(1), lastmod
+
+    def summary(self):
+        return f"sitemap: 读取 {self.sitemaps_fetched} 个文件, {self.entries_seen} 个条目"
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+翻译记忆（英文描述 -> 中文）
+- 精确索引：原文规范化（忽略大小写、标点和多余空白）后作为字典键，命中为O(1)
+- 模糊索引：规范化原文的字符三元组倒排索引，精确未命中时按共享三元组数计算Dice相似度，
+  不需要与全部条目逐一比较；超过阈值的条目还必须与原文的词完全对应（只允许词尾变化，
+  如"screenshot"/"screenshots"），"GPU"/"CPU"、"iPad"/"Mac"这类只差一个词的原文不会被当作同一句
+- 内置条目（代码中的defaults）优先于记忆文件，记忆文件只保存补充的条目，修改内置翻译立即生效
+- 未命中的原文和每个模糊命中（原文、匹配的条目、相似度）写入复核文件，便于人工补充和检查翻译；
+  在复核文件中填写或修改translation后，下次运行由import_review并入记忆文件
+"""
+
+import json
+import os
+import re
+from collections import Counter
+
+MEMORY_VERSION = 1
+
+# 模糊命中所需的最低Dice相似度（还要求词对应，见_word_stems）
+DEFAULT_THRESHOLD = 0.85
+
+NGRAM_SIZE = 3
+
+_NON_WORD_RE = re.compile(r'[\W_]+')
+
+# 视为同一个词的词尾变化
+_INFLECTION_SUFFIXES = ('ing', 'ed', 'es', 's')
+
+
+def normalize(text):
+    """规范化原文：小写，标点和连续空白合并为一个空格"""
+    return _NON_WORD_RE.sub(' ', text.casefold()).strip()
+
+
+def _stem(word):
+    for suffix in _INFLECTION_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def _word_stems(key):
+    """规范化原文的词干集合，模糊命中要求两边相同"""
+    return frozenset(_stem(word) for word in key.split())
+
+
+def ngrams(key, size=NGRAM_SIZE):
+    """规范化原文的字符n元组集合（两端补空格，短词也有n元组）"""
+    padded = f" {key} "
+    return {padded[i:i + size] for i in range(max(len(padded) - size + 1, 1))}
+
+
+class TranslationMemory:
+    """带精确索引和n元组模糊索引的翻译记忆"""
+
+    def __init__(self, entries=None, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.entries = {}
+        self._exact = {}
+        self._ids = {}
+        self._keys = []
+        self._sources = []
+        self._key_ngrams = []
+        self._index = {}
+        # 模糊查找的结果按规范化原文缓存，重复出现的近似原文也是O(1)
+        self._fuzzy_cache = {}
+        # 内置条目的规范化原文，保存时不写入记忆文件
+        self._default_keys = set()
+        self.hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+        self.missed = Counter()
+        # 原文 -> [匹配的条目原文, 相似度, 次数]
+        self.fuzzy_matched = {}
+        for source, target in (entries or {}).items():
+            self.add(source, target)
+
+    @classmethod
+    def load(cls, path, defaults=None, threshold=DEFAULT_THRESHOLD):
+        """载入记忆文件并加入defaults；同一原文以defaults为准，文件不存在时只使用defaults"""
+        memory = cls(threshold=threshold)
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for source, target in data.get('entries', {}).items():
+                memory.add(source, target)
+        for source, target in (defaults or {}).items():
+            memory.add(source, target)
+            memory._default_keys.add(normalize(source))
+        return memory
+
+    def import_review(self, path):
+        """把复核文件中人工填写的译文并入记忆，返回并入的条数；文件不存在时返回0
+
+        未命中的原文填写了translation时加入；模糊命中的translation被改为与匹配条目不同的译文时，
+        该原文作为单独的条目加入，之后精确命中，不再使用匹配的条目。内置条目不会被覆盖。
+        """
+        if not path or not os.path.exists(path):
+            return 0
+        with open(path, 'r', encoding='utf-8') as f:
+            review = json.load(f)
+        imported = 0
+        for item in review.get('misses', []):
+            if item.get('translation'):
+                imported += self._add_reviewed(item['text'], item['translation'])
+        for item in review.get('fuzzy_hits', []):
+            matched_target = self.entries.get(item.get('matched'))
+            if item.get('translation') and item['translation'] != matched_target:
+                imported += self._add_reviewed(item['text'], item['translation'])
+        return imported
+
+    def _add_reviewed(self, source, target):
+        if normalize(source) in self._default_keys:
+            return 0
+        self.add(source, target)
+        return 1
+
+    def add(self, source, target):
+        """添加或更新一条翻译"""
+        key = normalize(source)
+        if not key:
+            return
+        self.entries[source] = target
+        if key in self._ids:
+            previous = self._sources[self._ids[key]]
+            if previous != source:
+                del self.entries[previous]
+            self._sources[self._ids[key]] = source
+        else:
+            entry_id = self._ids[key] = len(self._keys)
+            self._keys.append(key)
+            self._sources.append(source)
+            grams = ngrams(key)
+            self._key_ngrams.append(len(grams))
+            for gram in grams:
+                self._index.setdefault(gram, []).append(entry_id)
+        self._exact[key] = target
+        self._fuzzy_cache.clear()
+
+    def _scored(self, key):
+        """[(相似度, 条目编号)]：所有与key共享n元组的条目"""
+        grams = ngrams(key)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._index.get(gram, ()))
+        return [(2 * count / (len(grams) + self._key_ngrams[entry_id]), entry_id)
+                for entry_id, count in shared.items()]
+
+    def fuzzy_lookup(self, key):
+        """返回(最相似条目的编号, 相似度)，没有共享n元组时返回(None, 0.0)"""
+        best, best_score = None, 0.0
+        for score, entry_id in self._scored(key):
+            if score > best_score:
+                best, best_score = entry_id, score
+        return best, best_score
+
+    def fuzzy_match(self, key):
+        """可以作为模糊命中的条目：相似度达到阈值且词干相同的最相似条目，返回(编号, 相似度)或None"""
+        stems = _word_stems(key)
+        candidates = sorted((item for item in self._scored(key) if item[0] >= self.threshold),
+                            key=lambda item: (-item[0], item[1]))
+        for score, entry_id in candidates:
+            if _word_stems(self._keys[entry_id]) == stems:
+                return entry_id, score
+        return None
+
+    def lookup(self, text):
+        """查找译文，未命中时返回None"""
+        key = normalize(text)
+        if not key:
+            return None
+        target = self._exact.get(key)
+        if target is not None:
+            self.hits += 1
+            return target
+        if key not in self._fuzzy_cache:
+            self._fuzzy_cache[key] = self.fuzzy_match(key)
+        match = self._fuzzy_cache[key]
+        if match is not None:
+            entry_id, score = match
+            self.fuzzy_hits += 1
+            record = self.fuzzy_matched.setdefault(text, [self._sources[entry_id], score, 0])
+            record[2] += 1
+            return self._exact[self._keys[entry_id]]
+        self.misses += 1
+        self.missed[text] += 1
+        return None
+
+    def translate(self, text):
+        """返回译文，未命中时原样返回"""
+        target = self.lookup(text)
+        return text if target is None else target
+
+    def save(self, path):
+        """原子地保存记忆条目（内置条目不写入，以代码中的为准）"""
+        entries = {source: target for source, target in self.entries.items()
+                   if normalize(source) not in self._default_keys}
+        data = json.dumps({'version': MEMORY_VERSION, 'entries': entries}, ensure_ascii=False, indent=2)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def write_review(self, path):
+        """写出复核文件：未命中的原文（按出现次数排序）及最相似的已有条目，translation留空供人工填写；
+        以及每个模糊命中的原文、实际使用的条目、译文和相似度，译文不对时直接修改translation"""
+        misses = []
+        for text, count in self.missed.most_common():
+            best, score = self.fuzzy_lookup(normalize(text))
+            misses.append({'text': text, 'count': count, 'translation': '',
+                           'closest': self._sources[best] if best is not None else None,
+                           'similarity': round(score, 3)})
+        fuzzy_hits = [{'text': text, 'count': count, 'matched': matched,
+                       'translation': self.entries[matched], 'similarity': round(score, 3)}
+                      for text, (matched, score, count)
+                      in sorted(self.fuzzy_matched.items(), key=lambda item: -item[1][2])]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'misses': misses, 'fuzzy_hits': fuzzy_hits}, f, ensure_ascii=False, indent=2)
+
+    def summary(self):
+        return (f"翻译记忆: {len(self.entries)} 条, 精确命中 {self.hits}, "
+                f"模糊命中 {self.fuzzy_hits}, 未命中 {self.misses}（{len(self.missed)} 种原文）")
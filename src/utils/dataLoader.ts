@@ -1,32 +1,117 @@
 import Papa from 'papaparse';
 import { App, AppStats } from '@/types/app';
 
-export const loadAppsData = async (): Promise<App[]> => {
+// 与 scripts/app_catalog.py 的 CATALOG_SCHEMA_VERSION 保持一致
+const CATALOG_SCHEMA_VERSION = 1;
+
+const CSV_FILE = 'apps_list_enhanced_descriptions.csv';
+const CATALOG_FILE = 'apps_catalog.json.gz';
+
+interface AppCatalog {
+  schema: { version: number; fields: { name: string; type: string }[] };
+  // 生成目录时CSV的SHA-256，构建前由 scripts/check_catalog.mjs 校验
+  source?: { file: string; sha256: string; size: number };
+  count: number;
+  columns: {
+    名称: string[];
+    功能描述: string[];
+    Setapp链接: (string | null)[];
+    官方网站: (string | null)[];
+    官方订阅价格: number[];
+    评分: number[];
+    平台: string[][];
+  };
+}
+
+const resolveDataPath = (fileName: string): string => {
+  const basePath = import.meta.env.BASE_URL || '/';
+  return basePath.endsWith('/') ? `${basePath}${fileName}` : `${basePath}/${fileName}`;
+};
+
+const splitPlatforms = (platform: string): string[] => {
+  const platforms = platform.split(',').map(p => p.trim()).filter(Boolean);
+  return platforms.length ? platforms : ['Mac'];
+};
+
+// 加载流水线生成的带类型目录（gzip压缩的按列JSON）；
+// 不可用（文件缺失、浏览器不支持解压、schema版本不符）时返回null
+const loadCatalog = async (): Promise<AppCatalog | null> => {
   try {
-    // 加载增强的CSV文件，包含更丰富的描述信息
-    const basePath = import.meta.env.BASE_URL || '/';
-    const csvPath = basePath.endsWith('/') ? `${basePath}apps_list_enhanced_descriptions.csv` : `${basePath}/apps_list_enhanced_descriptions.csv`;
-    const response = await fetch(csvPath);
+    const response = await fetch(resolveDataPath(CATALOG_FILE));
     if (!response.ok) {
-      throw new Error(`无法加载CSV文件: ${response.status}`);
+      return null;
     }
-    const csvText = await response.text();
-    
-    const result = Papa.parse<any>(csvText, {
-      header: true,
-      skipEmptyLines: true,
-      transform: (value, field) => {
-        // 转换数字字段
-        if (field === '官方订阅价格' || field === '评分') {
-          const numValue = parseFloat(value);
-          return isNaN(numValue) ? 0 : numValue;
-        }
-        return value?.trim() || '';
+    const bytes = new Uint8Array(await response.arrayBuffer());
+    let json: string;
+    // 服务器可能已按Content-Encoding解压，只有仍是gzip数据时才需要自行解压
+    if (bytes[0] === 0x1f && bytes[1] === 0x8b) {
+      if (typeof DecompressionStream === 'undefined') {
+        return null;
       }
-    });
+      const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+      json = await new Response(stream).text();
+    } else {
+      json = new TextDecoder().decode(bytes);
+    }
+    const catalog: AppCatalog = JSON.parse(json);
+    return catalog.schema?.version === CATALOG_SCHEMA_VERSION ? catalog : null;
+  } catch (error) {
+    console.warn('Catalog unavailable, falling back to CSV:', error);
+    return null;
+  }
+};
+
+// 目录中的数字已是number，平台已拆分，无需再解析
+const catalogRows = (catalog: AppCatalog): any[] => {
+  const { columns } = catalog;
+  return columns.名称.map((name, i) => ({
+    名称: name,
+    功能描述: columns.功能描述[i],
+    Setapp链接: columns.Setapp链接[i] || '',
+    官方网站: columns.官方网站[i] || '',
+    官方订阅价格: columns.官方订阅价格[i],
+    评分: columns.评分[i],
+    平台: columns.平台[i].join(', '),
+    平台列表: columns.平台[i]
+  }));
+};
+
+const parseCsvRows = (csvText: string): any[] => {
+  const result = Papa.parse<any>(csvText, {
+    header: true,
+    skipEmptyLines: true,
+    transform: (value, field) => {
+      // 转换数字字段
+      if (field === '官方订阅价格' || field === '评分') {
+        const numValue = parseFloat(value);
+        return isNaN(numValue) ? 0 : numValue;
+      }
+      return value?.trim() || '';
+    }
+  });
+  return result.data.map(row => ({ ...row, 平台列表: splitPlatforms(row['平台'] || '') }));
+};
+
+// 优先使用目录（构建前已校验与CSV一致），只在目录不可用时下载并解析CSV
+const loadRows = async (): Promise<any[]> => {
+  const catalog = await loadCatalog();
+  if (catalog) {
+    return catalogRows(catalog);
+  }
+  const response = await fetch(resolveDataPath(CSV_FILE));
+  if (!response.ok) {
+    throw new Error(`无法加载CSV文件: ${response.status}`);
+  }
+  return parseCsvRows(await response.text());
+};
+
+export const loadAppsData = async (): Promise<App[]> => {
+  try {
+    // 加载增强的应用数据（目录或CSV），包含更丰富的描述信息
+    const rows = await loadRows();
     
     // 映射和增强数据
-    return result.data.map(row => {
+    return rows.map(row => {
       const app: App = {
         名称: row['名称'] || '',
         功能描述: row['功能描述'] || '',
@@ -42,7 +127,7 @@ export const loadAppsData = async (): Promise<App[]> => {
         最后更新: generateLastUpdated(),
         应用大小: generateAppSize(),
         系统要求: generateSystemRequirements(row['平台']),
-        支持平台: parsePlatformSupport(row['平台']),
+        支持平台: parsePlatformSupport(row['平台列表']),
         功能介绍: generateEnhancedFeatureDescription(row)
       };
       
@@ -113,9 +198,8 @@ function generateSystemRequirements(platform: string): string {
   return 'macOS 10.15 或更高版本';
 }
 
-// 辅助函数：解析平台支持详情
-function parsePlatformSupport(platform: string): any {
-  const platforms = platform.split(',').map(p => p.trim());
+// 辅助函数：解析平台支持详情（platforms为已拆分的平台列表）
+function parsePlatformSupport(platforms: string[]): any {
   const support: any = {};
   
   if (platforms.some(p => p.includes('Mac'))) {